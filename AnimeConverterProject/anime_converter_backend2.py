@@ -1,13 +1,29 @@
 import os
 import logging
 import time
-from google.cloud import texttospeech, speech_v1p1beta1 as speech, translate_v2 as translate
-from google.cloud import storage
-from anime_converter_utils import split_audio_by_size, extract_audio, convert_to_mono, merge_audio_video
-from ocr_subtitle_extractor import extract_subtitles_with_google_vision  # Ensure correct function is imported
+import glob
+import shutil
+import hashlib
+import uuid
+import wave
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+# The google.cloud libraries are imported inside the functions that call them, so
+# importing this module doesn't pay for loading them until a cloud stage runs
+from anime_converter_utils import (split_audio_by_size, extract_audio, convert_to_mono, merge_audio_video,
+                                   extract_audio_for_recognition, read_wav_pcm, assemble_segment_track,
+                                   write_wav_pcm, synthesize_in_shards, split_text_into_shards, trim_to_speech,
+                                   map_to_original_time, get_wav_duration, compute_chunk_boundaries, read_pcm_blocks,
+                                   WAV_HEADER_BYTES)
+from anime_converter_cache import get_result_cache
+from anime_converter_tracing import span
+from anime_converter_clients import get_client, get_client_registry
 
 # OCR processing function
 def process_video_with_ocr(video_path):
+    # Imported here so the audio pipeline can run without the OCR module's Tk dependency
+    from ocr_subtitle_extractor import extract_subtitles_with_google_vision
     logging.info(f"Starting OCR processing for video: {video_path}")
     subtitles = extract_subtitles_with_google_vision(video_path)
     logging.info(f"OCR processing completed. Extracted subtitles: {len(subtitles)}")
@@ -24,68 +40,567 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-def upload_to_gcs(bucket_name, source_file_name, destination_blob_name):
-    """Uploads a file to the bucket."""
-    storage_client = storage.Client()
-    bucket = storage_client.bucket(bucket_name)
-    blob = bucket.blob(destination_blob_name)
+# Number of chunks kept uploading/recognizing at the same time
+TRANSCRIBE_MAX_WORKERS = 4
+GCS_BUCKET_NAME = "chum_bucket99"  # Replace with your actual GCS bucket name
+# Cut music, silence and effects before uploading; recognized times are mapped back to the original
+TRIM_SILENCE = True
 
-    blob.upload_from_filename(source_file_name)
+# Uploaded objects are named by content under this prefix, so reruns and other
+# episodes with the same audio find them already there
+GCS_UPLOAD_PREFIX = "audio/"
+# Files at least this large go up as parallel parts composed into one object
+GCS_PARALLEL_UPLOAD_BYTES = 32 * 1024 * 1024
+GCS_UPLOAD_PART_BYTES = 8 * 1024 * 1024
+GCS_UPLOAD_MAX_WORKERS = 8
+GCS_COMPOSE_MAX_PARTS = 32  # compose accepts at most 32 source objects
+
+def _file_sha256(path, block_bytes=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_bytes), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _upload_part(bucket, part_name, source_file_name, start, size):
+    part = bucket.blob(part_name)
+    with open(source_file_name, 'rb') as f:
+        f.seek(start)
+        part.upload_from_file(f, size=size)
+    return part
+
+def _upload_in_parts(bucket, blob, source_file_name, size, part_bytes, max_workers):
+    """Uploads byte ranges of the file as temporary objects in parallel, then composes them into blob."""
+    part_bytes = max(part_bytes, -(-size // GCS_COMPOSE_MAX_PARTS))
+    ranges = [(start, min(part_bytes, size - start)) for start in range(0, size, part_bytes)]
+    # Unique per upload, so concurrent uploads of the same content never compose or delete each other's parts
+    part_prefix = f"{blob.name}.{uuid.uuid4().hex}.part"
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [executor.submit(_upload_part, bucket, f"{part_prefix}{index}", source_file_name, start, length)
+                   for index, (start, length) in enumerate(ranges)]
+        try:
+            blob.compose([future.result() for future in futures])
+        finally:
+            # After a failed part, wait for the others and remove every part that did upload
+            for future in futures:
+                future.cancel()
+            for future in futures:
+                if future.cancelled() or future.exception() is not None:
+                    continue
+                try:
+                    future.result().delete()
+                except Exception as e:
+                    logging.warning(f"Could not delete temporary part {future.result().name}: {e}")
+
+def upload_to_gcs(bucket_name, source_file_name, destination_blob_name=None, storage_client=None,
+                  parallel_threshold=GCS_PARALLEL_UPLOAD_BYTES, part_bytes=GCS_UPLOAD_PART_BYTES,
+                  max_workers=GCS_UPLOAD_MAX_WORKERS):
+    """
+    Uploads a file to the bucket, by default under a name derived from its SHA-256
+    so identical content maps to one object. The upload is skipped when the object
+    already exists with the same size and recorded checksum. Files of at least
+    parallel_threshold bytes are sent as parallel parts of part_bytes.
+    """
+    bucket = storage_client.bucket(bucket_name) if storage_client else get_client_registry().bucket(bucket_name)
+    size = os.path.getsize(source_file_name)
+    with span("gcs_upload", "api") as upload_span:
+        checksum = _file_sha256(source_file_name)
+        if destination_blob_name is None:
+            destination_blob_name = f"{GCS_UPLOAD_PREFIX}{checksum}{os.path.splitext(source_file_name)[1]}"
+
+        existing = bucket.get_blob(destination_blob_name)
+        if existing is not None and existing.size == size and (existing.metadata or {}).get("sha256") == checksum:
+            upload_span.add(skipped=1)
+            logging.info(f"File {source_file_name} already in the bucket as {destination_blob_name}; skipped upload.")
+            return f"gs://{bucket_name}/{destination_blob_name}"
+
+        blob = bucket.blob(destination_blob_name)
+        blob.metadata = {"sha256": checksum}
+        upload_span.add(bytes_out=size)
+        if size >= parallel_threshold:
+            _upload_in_parts(bucket, blob, source_file_name, size, part_bytes, max_workers)
+        else:
+            blob.upload_from_filename(source_file_name)
 
     logging.info(f"File {source_file_name} uploaded to {destination_blob_name}.")
 
     return f"gs://{bucket_name}/{destination_blob_name}"
 
-def transcribe_audio(audio_path, update_progress=None):
-    client = speech.SpeechClient()
-    audio_chunks = split_audio_by_size(audio_path)
-    total_chunks = len(audio_chunks)
-    bucket_name = "chum_bucket99"  # Replace with your actual GCS bucket name
+def _resolve_cache(cache):
+    """None means the shared on-disk cache; False turns caching off."""
+    if cache is False:
+        return None
+    return cache or get_result_cache()
+
+def _chunk_offsets(audio_chunks):
+    """Returns the start time in seconds of each chunk within the original audio."""
+    offsets = []
+    position = 0.0
+    for chunk in audio_chunks:
+        offsets.append(position)
+        with wave.open(chunk, 'rb') as wav_file:
+            position += wav_file.getnframes() / wav_file.getframerate()
+    return offsets
 
-    transcripts = []
-    for index, chunk in enumerate(audio_chunks):
+def _segments_from_response(response):
+    """
+    Turns recognition results into segments timed relative to the chunk,
+    using word time offsets where available and result end times otherwise.
+    """
+    segments = []
+    previous_end = 0.0
+    for result in response.results:
+        if not result.alternatives:
+            continue
+        alternative = result.alternatives[0]
+        if alternative.words:
+            start = alternative.words[0].start_time.total_seconds()
+            end = alternative.words[-1].end_time.total_seconds()
+        else:
+            start = previous_end
+            end = result.result_end_time.total_seconds()
+        segments.append({"start": start, "end": end, "text": alternative.transcript.strip()})
+        previous_end = end
+    return segments
+
+def _transcribe_chunk(client, storage_client, bucket_name, chunk, config, recognition_params, cache):
+    """Uploads one chunk and returns its segments, timed relative to the start of the chunk."""
+    from google.cloud import speech_v1p1beta1 as speech
+    with span("transcribe_chunk", "chunk", chunk=os.path.basename(chunk)):
         start_time = time.time()
 
-        # Upload the chunk to GCS and get the URI
-        gcs_uri = upload_to_gcs(bucket_name, chunk, os.path.basename(chunk))
+        if cache:
+            with open(chunk, 'rb') as f:
+                cache_key = cache.make_key("transcription", f.read(), **recognition_params)
+            cached = cache.get_json(cache_key)
+            if cached is not None:
+                logging.info(f"Using cached transcription for chunk {chunk}")
+                return cached
 
+        # Upload the chunk to GCS (or find it there already) and get the URI
+        gcs_uri = upload_to_gcs(bucket_name, chunk, storage_client=storage_client)
         audio = speech.RecognitionAudio(uri=gcs_uri)
-        config = speech.RecognitionConfig(
-            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-            sample_rate_hertz=44100,
-            language_code="ja-JP"
-        )
 
         # Use LongRunningRecognize for longer chunks
         logging.debug(f"Starting transcription for chunk {chunk}")
-        try:
+        with span("long_running_recognize", "api", chunk=os.path.basename(chunk)) as recognize_span:
             operation = client.long_running_recognize(config=config, audio=audio)
             response = operation.result(timeout=300)  # Adjust timeout as necessary
+            recognize_span.add(items=len(response.results))
 
-            for result in response.results:
-                transcripts.append(result.alternatives[0].transcript)
-        except Exception as e:
-            logging.error(f"Error transcribing chunk {chunk}: {e}")
-            raise e
+        segments = _segments_from_response(response)
+        if cache:
+            cache.put_json(cache_key, segments)
 
         duration = time.time() - start_time
         logging.info(f"Completed transcription for chunk {chunk} in {duration:.2f} seconds")
 
-        if update_progress:
-            update_progress['value'] = int((index + 1) / total_chunks * 100)
+    return segments
+
+def transcribe_audio_segments(audio_path, update_progress=None, max_workers=TRANSCRIBE_MAX_WORKERS,
+                              speech_client=None, storage_client=None, bucket_name=GCS_BUCKET_NAME, cache=None,
+                              units=None, trim_silence=TRIM_SILENCE, stats=None):
+    """
+    Transcribes audio_path chunk by chunk, keeping up to max_workers chunks in
+    flight, and returns one {"start", "end", "text"} segment per recognized
+    utterance with times in seconds from the start of the audio. Segments are
+    reassembled in chunk order whatever order the chunks finish in.
+    Chunks whose bytes and recognition parameters were seen before come from the cache,
+    and with units (a JobUnits) chunks this job already finished are not redone.
+    With trim_silence only the detected speech is uploaded; stats, if given, receives
+    the fraction of audio removed.
+    """
+    from google.cloud import speech_v1p1beta1 as speech
+    client = speech_client or get_client("speech")
+    cache = _resolve_cache(cache)
+    offset_map = None
+    recognized_path = audio_path
+    if trim_silence:
+        recognized_path, offset_map, removed_fraction = trim_to_speech(audio_path)
+        if stats is not None:
+            stats["removed_fraction"] = round(removed_fraction, 4)
+        if not offset_map:
+            logging.info(f"No speech detected in {audio_path}; nothing to transcribe")
+            return []
+    audio_chunks = split_audio_by_size(recognized_path)
+    total_chunks = len(audio_chunks)
 
-    full_transcript = ' '.join(transcripts).strip()
-    logging.info("Full transcription completed.")
+    # Describe the audio as it actually is rather than assuming 44.1 kHz
+    with wave.open(audio_path, 'rb') as wav_file:
+        if wav_file.getsampwidth() != 2:
+            raise ValueError(f"{audio_path} must be 16-bit PCM for LINEAR16 recognition")
+        recognition_params = {
+            "encoding": "LINEAR16",
+            "sample_rate_hertz": wav_file.getframerate(),
+            "audio_channel_count": wav_file.getnchannels(),
+            "language_code": "ja-JP",
+            "enable_word_time_offsets": True,
+        }
+    config = speech.RecognitionConfig(
+        encoding=getattr(speech.RecognitionConfig.AudioEncoding, recognition_params["encoding"]),
+        sample_rate_hertz=recognition_params["sample_rate_hertz"],
+        audio_channel_count=recognition_params["audio_channel_count"],
+        language_code=recognition_params["language_code"],
+        enable_word_time_offsets=recognition_params["enable_word_time_offsets"]
+    )
+    chunk_offsets = _chunk_offsets(audio_chunks)
+
+    chunk_segments = [units.get("transcribe_chunk", index) if units else None for index in range(total_chunks)]
+    completed = sum(1 for segments in chunk_segments if segments is not None)
+    if completed:
+        logging.info(f"Resuming transcription: {completed} of {total_chunks} chunks already done")
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(_transcribe_chunk, client, storage_client, bucket_name, chunk, config,
+                            recognition_params, cache): index
+            for index, chunk in enumerate(audio_chunks) if chunk_segments[index] is None
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                chunk_segments[index] = future.result()
+            except Exception as e:
+                logging.error(f"Error transcribing chunk {index} ({audio_chunks[index]}): {e}")
+                # Let chunks already in flight finish so a resume doesn't redo them
+                executor.shutdown(wait=True, cancel_futures=True)
+                if units:
+                    for other, other_index in futures.items():
+                        if other.done() and not other.cancelled() and other.exception() is None \
+                                and chunk_segments[other_index] is None:
+                            units.put("transcribe_chunk", other_index, other.result())
+                raise RuntimeError(f"Transcription failed for chunk {index} ({audio_chunks[index]}): {e}") from e
+            if units:
+                units.put("transcribe_chunk", index, chunk_segments[index])
+
+            completed += 1
+            if update_progress:
+                update_progress['value'] = int(completed / total_chunks * 100)
+
+    segments = []
+    for offset, chunk in zip(chunk_offsets, chunk_segments):
+        for segment in chunk:
+            segments.append(dict(segment, start=segment["start"] + offset, end=segment["end"] + offset))
+    if offset_map:
+        # Back from trimmed-audio time to original video time
+        segments = [dict(segment, start=map_to_original_time(segment["start"], offset_map),
+                         end=map_to_original_time(segment["end"], offset_map, is_end=True))
+                    for segment in segments]
+
+    logging.info(f"Full transcription completed: {len(segments)} segments.")
+    if cache:
+        logging.info(f"Result cache after transcription: {cache.stats()}")
+
+    return segments
+
+def remove_transcription_files(audio_path):
+    """
+    Deletes the intermediates transcribing audio_path leaves next to it: the
+    trimmed speech WAV and the chunk files cut from either of them.
+    """
+    speech_path = f"{os.path.splitext(audio_path)[0]}_speech.wav"
+    paths = [speech_path] + glob.glob(f"{glob.escape(audio_path)}_chunk_*.wav") \
+        + glob.glob(f"{glob.escape(speech_path)}_chunk_*.wav")
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    logging.info(f"Removed transcription intermediates of {audio_path}")
+
+def transcribe_audio(audio_path, update_progress=None, **kwargs):
+    """Transcribes audio_path and returns the whole transcript as one string."""
+    segments = transcribe_audio_segments(audio_path, update_progress, **kwargs)
+    full_transcript = ' '.join(segment["text"] for segment in segments).strip()
     logging.debug(f"Full transcript: {full_transcript[:500]}...")  # Log the first 500 characters
 
     return full_transcript
 
-def translate_text(text, update_progress=None):
+# "batch" uploads chunks to GCS for long_running_recognize; "streaming" sends PCM
+# straight from the local audio over streaming_recognize, with no upload
+RECOGNITION_MODE = os.getenv("ANIME_RECOGNITION_MODE", "batch")
+# Each stream is cut well inside the API's limit of about five minutes of audio
+STREAMING_MAX_SECONDS = 240
+STREAMING_BLOCK_MS = 100  # Audio per request message; the API wants at most 25 KB
+STREAMING_MAX_WORKERS = 4  # Streams open at once when recognizing a file
+
+_STREAM_DONE = object()
+_WINDOW_DONE = object()
+
+def _streaming_config(sample_rate, language_code="ja-JP"):
+    from google.cloud import speech_v1p1beta1 as speech
+    return speech.StreamingRecognitionConfig(
+        config=speech.RecognitionConfig(
+            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+            sample_rate_hertz=sample_rate,
+            audio_channel_count=1,
+            language_code=language_code,
+            enable_word_time_offsets=True
+        ),
+        interim_results=False
+    )
+
+def _stream_window(client, streaming_config, pcm_blocks, offset, emit):
+    """
+    Runs one streaming_recognize call over pcm_blocks and passes each final result
+    to emit as a dict with "start", "end" and "text", timed in seconds from the start
+    of the whole audio (offset is where this stream starts). Interim results are
+    dropped, in case the server sends them anyway.
+    """
+    from google.cloud import speech_v1p1beta1 as speech
+    requests = (speech.StreamingRecognizeRequest(audio_content=block) for block in pcm_blocks)
+    previous_end = 0.0
+    with span("streaming_recognize", "api", offset=offset) as stream_span:
+        for response in client.streaming_recognize(config=streaming_config, requests=requests):
+            for result in response.results:
+                if not result.is_final or not result.alternatives:
+                    continue
+                alternative = result.alternatives[0]
+                start = previous_end
+                end = result.result_end_time.total_seconds()
+                if alternative.words:
+                    start = alternative.words[0].start_time.total_seconds()
+                    end = alternative.words[-1].end_time.total_seconds()
+                previous_end = end
+                stream_span.add(items=1)
+                emit({"start": offset + start, "end": offset + end, "text": alternative.transcript.strip()})
+
+def _pcm_windows(pcm_blocks, window_bytes):
+    """
+    Cuts one stream of PCM blocks into consecutive windows of about window_bytes,
+    yielding (start_byte, blocks); each window must be used up before the next.
+    """
+    blocks = iter(pcm_blocks)
+    state = {"next": next(blocks, None), "position": 0}
+    while state["next"] is not None:
+        def window():
+            sent = 0
+            while state["next"] is not None and sent < window_bytes:
+                block = state["next"]
+                sent += len(block)
+                state["position"] += len(block)
+                yield block
+                state["next"] = next(blocks, None)
+        yield state["position"], window()
+
+def stream_transcribe(audio_source, sample_rate=None, speech_client=None, on_window_done=None,
+                      max_stream_seconds=STREAMING_MAX_SECONDS, max_workers=STREAMING_MAX_WORKERS):
+    """
+    Generator that recognizes speech over the streaming API and yields final results
+    (see _stream_window) as they arrive. audio_source is either a mono 16-bit WAV
+    path, whose windows of max_stream_seconds stream concurrently, or an iterable of
+    raw PCM blocks at sample_rate (e.g. stream_pcm_from_video), streamed window after
+    window as the blocks arrive. on_window_done, if given, is called from the
+    consuming thread as on_window_done(completed, total) each time a window finishes;
+    total is None for raw blocks, whose length isn't known up front.
+    """
+    client = speech_client or get_client("speech")
+    results = queue.Queue()
+
+    if isinstance(audio_source, str):
+        with wave.open(audio_source, 'rb') as wav_file:
+            if wav_file.getnchannels() != 1 or wav_file.getsampwidth() != 2:
+                raise ValueError(f"{audio_source} must be mono 16-bit PCM for streaming recognition")
+            sample_rate = wav_file.getframerate()
+            window_bytes = WAV_HEADER_BYTES + max_stream_seconds * sample_rate * 2
+            windows = compute_chunk_boundaries(wav_file, window_bytes, snap_to_silence=True)
+        block_frames = sample_rate * STREAMING_BLOCK_MS // 1000
+        sources = [(start / sample_rate, read_pcm_blocks(audio_source, start, end, block_frames))
+                   for start, end in windows]
+        total_windows = len(sources)
+    else:
+        if not sample_rate:
+            raise ValueError("sample_rate is required when streaming raw PCM blocks")
+        max_workers = 1  # One source, consumed in order
+        sources = None
+        total_windows = None
+    config = _streaming_config(sample_rate)
+
+    def stream_window(blocks, offset):
+        _stream_window(client, config, blocks, offset, results.put)
+        results.put(_WINDOW_DONE)
+
+    def run_streams():
+        try:
+            if sources is not None:
+                with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                    futures = [executor.submit(stream_window, blocks, offset) for offset, blocks in sources]
+                    for future in as_completed(futures):
+                        future.result()
+            else:
+                for start_byte, blocks in _pcm_windows(audio_source, max_stream_seconds * sample_rate * 2):
+                    stream_window(blocks, start_byte / (sample_rate * 2))
+            results.put(_STREAM_DONE)
+        except Exception as e:
+            logging.error(f"Streaming recognition failed: {e}")
+            results.put(e)
+
+    threading.Thread(target=run_streams, daemon=True).start()
+    completed_windows = 0
+    while True:
+        result = results.get()
+        if result is _STREAM_DONE:
+            return
+        if isinstance(result, Exception):
+            raise result
+        if result is _WINDOW_DONE:
+            # Counted here, on one thread, so callers only ever see the count go up
+            completed_windows += 1
+            if on_window_done:
+                on_window_done(completed_windows, total_windows)
+            continue
+        yield result
+
+def transcribe_audio_segments_streaming(audio_path, update_progress=None, speech_client=None,
+                                        trim_silence=TRIM_SILENCE, stats=None, on_result=None, **kwargs):
+    """
+    Same result as transcribe_audio_segments, but streams PCM from the local file
+    instead of uploading chunks to GCS. on_result, if given, sees each final result
+    as it arrives (times in the audio streamed, i.e. after trimming). Progress goes
+    up as windows finish.
+    """
+    offset_map = None
+    recognized_path = audio_path
+    if trim_silence:
+        recognized_path, offset_map, removed_fraction = trim_to_speech(audio_path)
+        if stats is not None:
+            stats["removed_fraction"] = round(removed_fraction, 4)
+        if not offset_map:
+            logging.info(f"No speech detected in {audio_path}; nothing to transcribe")
+            return []
+
+    def window_done(completed, total):
+        if update_progress and total:
+            update_progress['value'] = int(completed / total * 100)
+
+    segments = []
+    for result in stream_transcribe(recognized_path, speech_client=speech_client,
+                                    on_window_done=window_done, **kwargs):
+        if on_result:
+            on_result(result)
+        if result["text"]:
+            segments.append(result)
+
+    # Streams finish in any order
+    segments.sort(key=lambda segment: segment["start"])
+    if offset_map:
+        segments = [dict(segment, start=map_to_original_time(segment["start"], offset_map),
+                         end=map_to_original_time(segment["end"], offset_map, is_end=True))
+                    for segment in segments]
+    logging.info(f"Streaming transcription completed: {len(segments)} segments.")
+    return segments
+
+# Sample rate requested for all TTS so shards and segments can share one track
+TTS_SAMPLE_RATE = 24000
+SEGMENT_MAX_WORKERS = 8
+# The TTS API rejects inputs over 5000 bytes; smaller shards also synthesize in parallel
+TTS_SHARD_MAX_BYTES = 1500
+TTS_MAX_WORKERS = 8
+
+# Translation API v2 accepts at most 128 segments per request; the character
+# cap keeps each request comfortably inside its payload limit
+TRANSLATE_MAX_SEGMENTS = 128
+TRANSLATE_MAX_CHARS = 30000
+TRANSLATE_MAX_WORKERS = 4
+
+def _pack_translation_batches(texts, max_segments=TRANSLATE_MAX_SEGMENTS, max_chars=TRANSLATE_MAX_CHARS):
+    """Groups positions in texts into consecutive batches under the per-request limits."""
+    batches = []
+    current = []
+    current_chars = 0
+    for position, text in enumerate(texts):
+        if current and (len(current) >= max_segments or current_chars + len(text) > max_chars):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(position)
+        current_chars += len(text)
+    if current:
+        batches.append(current)
+    return batches
+
+def _translate_batch(client, batch_texts, target_language):
+    with span("translate_batch", "api", items=len(batch_texts)) as translate_span:
+        results = client.translate(batch_texts, target_language=target_language)
+        translate_span.add(bytes_out=sum(len(text.encode('utf-8')) for text in batch_texts),
+                           bytes_in=sum(len(result['translatedText'].encode('utf-8')) for result in results))
+    return results
+
+def translate_texts(texts, update_progress=None, max_workers=TRANSLATE_MAX_WORKERS, cache=None,
+                    translate_client=None, target_language="en", units=None):
+    """
+    Translates a list of strings, packing them into batches under the per-request
+    segment and character limits and sending up to max_workers batches at once.
+    Results are returned in input order; cached and blank strings are never sent,
+    nor are strings recorded as finished in units (a JobUnits) by an earlier run.
+    """
+    cache = _resolve_cache(cache)
+    translated = list(texts)
+    cache_keys = {}
+    pending = []
+    for index, text in enumerate(texts):
+        if not text.strip():
+            continue
+        recorded = units.get("translate_text", index) if units else None
+        if recorded is not None:
+            translated[index] = recorded
+            continue
+        if cache:
+            cache_keys[index] = cache.make_key("translation", text, target_language=target_language)
+            cached = cache.get_json(cache_keys[index])
+            if cached is not None:
+                translated[index] = cached
+                continue
+        pending.append(index)
+
+    if not pending:
+        logging.info(f"All {len(texts)} texts translated from cache.")
+        return translated
+
+    client = translate_client or get_client("translate")
+    batches = [[pending[position] for position in batch]
+               for batch in _pack_translation_batches([texts[index] for index in pending])]
+    logging.info(f"Translating {len(pending)} of {len(texts)} texts in {len(batches)} batches.")
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(_translate_batch, client, [texts[index] for index in batch], target_language): batch
+            for batch in batches
+        }
+        for completed, future in enumerate(as_completed(futures), start=1):
+            batch = futures[future]
+            try:
+                results = future.result()
+            except Exception as e:
+                logging.error(f"Error translating batch of texts {batch[0]}-{batch[-1]}: {e}")
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise e
+            for index, result in zip(batch, results):
+                translated[index] = result['translatedText']
+                if cache:
+                    cache.put_json(cache_keys[index], translated[index])
+                if units:
+                    units.put("translate_text", index, translated[index])
+            if update_progress:
+                update_progress['value'] = int(completed / len(batches) * 100)
+
+    return translated
+
+def translate_text(text, update_progress=None, cache=None, **kwargs):
+    """
+    Translates a string, or a list of strings (see translate_texts).
+    A string longer than one request allows is split at sentence boundaries,
+    translated as a batch and rejoined.
+    """
     try:
-        translate_client = translate.Client()
+        if not isinstance(text, str):
+            return translate_texts(text, update_progress, cache=cache, **kwargs)
+
         logging.debug(f"Translating text with target language 'en': {text[:500]}...")  # Log the first 500 characters
-        result = translate_client.translate(text, target_language="en")
-        translated_text = result['translatedText']
+        if len(text) > TRANSLATE_MAX_CHARS:
+            pieces = split_text_into_shards(text, TRANSLATE_MAX_CHARS)
+            translated_text = ' '.join(translate_texts(pieces, update_progress, cache=cache, **kwargs))
+        else:
+            translated_text = translate_texts([text], update_progress, cache=cache, **kwargs)[0]
         logging.info("Text translation completed.")
         logging.debug(f"Translated text: {translated_text[:500]}...")  # Log the first 500 characters
 
@@ -97,38 +612,129 @@ def translate_text(text, update_progress=None):
         logging.error(f"Error translating text: {e}")
         raise e
 
-def synthesize_speech(text, output_audio_path, update_progress=None):
+def translate_segments(segments, update_progress=None, cache=None, **kwargs):
+    """
+    Translates every segment's text in batched requests and returns copies
+    carrying a "translated_text" key, in the same order as the input.
+    """
+    translated_texts = translate_texts([segment["text"] for segment in segments], update_progress, cache=cache, **kwargs)
+    translated = [dict(segment, translated_text=translated_text)
+                  for segment, translated_text in zip(segments, translated_texts)]
+    logging.info(f"Translated {len(translated)} segments.")
+    return translated
+
+def _synthesize_pcm(client, text, cache):
+    """Returns mono 16-bit PCM at TTS_SAMPLE_RATE for text, without the WAV header."""
+    from google.cloud import texttospeech
+    tts_params = {
+        "language_code": "en-US",
+        "ssml_gender": "NEUTRAL",
+        "audio_encoding": "LINEAR16",
+        "sample_rate_hertz": TTS_SAMPLE_RATE,
+    }
+    cache_key = cache.make_key("tts", text, **tts_params) if cache else None
+    audio_content = cache.get(cache_key) if cache else None
+
+    if audio_content is None:
+        with span("synthesize_speech", "api", bytes_out=len(text.encode('utf-8'))) as synthesize_span:
+            response = client.synthesize_speech(
+                input=texttospeech.SynthesisInput(text=text),
+                voice=texttospeech.VoiceSelectionParams(
+                    language_code=tts_params["language_code"],
+                    ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL
+                ),
+                audio_config=texttospeech.AudioConfig(
+                    audio_encoding=texttospeech.AudioEncoding.LINEAR16,
+                    sample_rate_hertz=tts_params["sample_rate_hertz"]
+                ),
+                timeout=300
+            )
+            audio_content = response.audio_content
+            synthesize_span.add(bytes_in=len(audio_content))
+        if cache:
+            cache.put(cache_key, audio_content)
+
+    return read_wav_pcm(audio_content, TTS_SAMPLE_RATE)
+
+def synthesize_speech(text, output_audio_path, update_progress=None, cache=None,
+                      max_workers=TTS_MAX_WORKERS, max_shard_bytes=TTS_SHARD_MAX_BYTES, tts_client=None):
+    """
+    Splits text at sentence boundaries into shards under max_shard_bytes, synthesizes
+    up to max_workers shards at once and writes the PCM, joined in order, as one WAV.
+    """
     try:
-        client = texttospeech.TextToSpeechClient()
-        input_text = texttospeech.SynthesisInput(text=text)
-        voice = texttospeech.VoiceSelectionParams(
-            language_code="en-US",
-            ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL
-        )
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.LINEAR16
-        )
+        client = tts_client or get_client("tts")
+        cache = _resolve_cache(cache)
+
+        def on_shard_done(completed, total):
+            if update_progress:
+                update_progress['value'] = int(completed / total * 100)
 
         logging.debug(f"Starting speech synthesis with text: {text[:500]}...")  # Log the first 500 characters
-        response = client.synthesize_speech(
-            input=input_text,
-            voice=voice,
-            audio_config=audio_config,
-            timeout=300  # Increased timeout
+        pcm = synthesize_in_shards(
+            text, lambda shard: _synthesize_pcm(client, shard, cache), max_shard_bytes, max_workers, on_shard_done
         )
-
-        with open(output_audio_path, "wb") as out:
-            out.write(response.audio_content)
+        write_wav_pcm(output_audio_path, pcm, TTS_SAMPLE_RATE)
         logging.info(f"Synthesized speech saved to {output_audio_path}")
 
-        if update_progress:
-            update_progress['value'] = 100
-
         return output_audio_path
     except Exception as e:
         logging.error(f"Error during speech synthesis: {e}")
         raise e
 
+def synthesize_segments(segments, output_audio_path, total_duration, update_progress=None,
+                        max_workers=SEGMENT_MAX_WORKERS, tts_client=None, cache=None, units=None):
+    """
+    Synthesizes each segment's translated text concurrently and writes every
+    result at its segment's start time into a single track of total_duration seconds.
+    With units (a JobUnits), each finished segment's PCM is kept next to the output
+    and recorded, so a rerun only synthesizes the segments that are missing.
+    """
+    client = tts_client or get_client("tts")
+    cache = _resolve_cache(cache)
+    segment_dir = f"{output_audio_path}.segments"
+    if units:
+        os.makedirs(segment_dir, exist_ok=True)
+
+    segment_pcm = [b""] * len(segments)
+    to_synthesize = []
+    for index, segment in enumerate(segments):
+        if not segment.get("translated_text"):
+            continue
+        recorded_path = units.get("synthesize_segment", index) if units else None
+        if recorded_path and os.path.exists(recorded_path):
+            with open(recorded_path, 'rb') as f:
+                segment_pcm[index] = f.read()
+        else:
+            to_synthesize.append(index)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(_synthesize_pcm, client, segments[index]["translated_text"], cache): index
+            for index in to_synthesize
+        }
+        for completed, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            try:
+                segment_pcm[index] = future.result()
+            except Exception as e:
+                logging.error(f"Error synthesizing segment {index}: {e}")
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise RuntimeError(f"Speech synthesis failed for segment {index}: {e}") from e
+            if units:
+                segment_path = os.path.join(segment_dir, f"segment_{index}.pcm")
+                with open(segment_path, 'wb') as f:
+                    f.write(segment_pcm[index])
+                units.put("synthesize_segment", index, segment_path)
+            if update_progress:
+                update_progress['value'] = int(completed / len(futures) * 100)
+
+    assemble_segment_track(segments, segment_pcm, output_audio_path, total_duration, TTS_SAMPLE_RATE)
+    # The per-segment PCM only serves resuming an interrupted run; the track now holds it all
+    shutil.rmtree(segment_dir, ignore_errors=True)
+    logging.info(f"Synthesized {len(futures)} segments into {output_audio_path}")
+    return output_audio_path
+
 # Isolated testing functions
 def test_transcription(audio_path):
     transcript = transcribe_audio(audio_path)
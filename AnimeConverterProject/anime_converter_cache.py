@@ -0,0 +1,136 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Where cached cloud results live and how large the cache may grow
+CACHE_DIR = os.getenv("ANIME_CACHE_DIR", "D:/Anime/cache")
+CACHE_MAX_BYTES = int(os.getenv("ANIME_CACHE_MAX_BYTES", 2 * 1024 ** 3))  # 2 GB
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache for transcription, translation and TTS results.
+    Entries are keyed by a hash of the input plus every request parameter, written
+    atomically, and evicted least-recently-used first once max_bytes is exceeded.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> size in bytes, least recently used first
+        self._total_bytes = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # File mtimes record last use, so LRU order survives restarts
+        existing = []
+        for name in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, name)
+            if name.endswith('.tmp'):
+                os.remove(path)  # Left behind by an interrupted write
+                continue
+            info = os.stat(path)
+            existing.append((info.st_mtime, name, info.st_size))
+        for _, name, size in sorted(existing):
+            self._entries[name] = size
+            self._total_bytes += size
+
+    @staticmethod
+    def make_key(kind, data, **params):
+        """Hashes the kind of result, its request parameters and the raw input (bytes or text)."""
+        digest = hashlib.sha256()
+        digest.update(kind.encode('utf-8') + b'\0')
+        digest.update(json.dumps(params, sort_keys=True).encode('utf-8') + b'\0')
+        digest.update(data if isinstance(data, bytes) else data.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key):
+        """Returns the cached bytes for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+                self._total_bytes -= self._entries.pop(key, 0)
+            return None
+
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # A concurrent put() evicted it after the read; the value read is still good
+            with self._lock:
+                self.hits += 1
+            return value
+        with self._lock:
+            self.hits += 1
+            if key not in self._entries:
+                self._total_bytes += len(value)
+            self._entries[key] = len(value)
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """Stores value (bytes) under key, then evicts old entries if over the size cap."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(value)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._total_bytes += len(value) - self._entries.pop(key, 0)
+            self._entries[key] = len(value)
+            self._evict()
+
+    def _evict(self):
+        # Caller holds self._lock
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            logging.debug(f"Evicted cache entry {key} ({size} bytes)")
+
+    def get_json(self, key):
+        value = self.get(key)
+        return None if value is None else json.loads(value.decode('utf-8'))
+
+    def put_json(self, key, value):
+        self.put(key, json.dumps(value).encode('utf-8'))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+            }
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_result_cache():
+    """Returns the process-wide cache, creating it on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+        return _default_cache
@@ -0,0 +1,113 @@
+import os
+import logging
+import threading
+from collections import Counter
+from anime_converter_tracing import span
+
+# host:port of a local stand-in for the Speech API (see speech_standin_server.py)
+SPEECH_ENDPOINT = os.getenv("ANIME_SPEECH_ENDPOINT")
+
+def create_speech_client(endpoint=SPEECH_ENDPOINT):
+    """A SpeechClient, talking plaintext gRPC to endpoint if one is given (for a local stand-in)."""
+    from google.cloud import speech_v1p1beta1 as speech
+    if endpoint:
+        import grpc
+        from google.cloud.speech_v1p1beta1.services.speech.transports import SpeechGrpcTransport
+        return speech.SpeechClient(transport=SpeechGrpcTransport(channel=grpc.insecure_channel(endpoint)))
+    return speech.SpeechClient()
+
+def _create_storage_client():
+    from google.cloud import storage
+    return storage.Client()
+
+def _create_translate_client():
+    from google.cloud import translate_v2 as translate
+    return translate.Client()
+
+def _create_tts_client():
+    from google.cloud import texttospeech
+    return texttospeech.TextToSpeechClient()
+
+def _create_vision_client():
+    from google.cloud import vision
+    return vision.ImageAnnotatorClient()
+
+# Client name -> (factory, connection kind). Each gRPC client owns one channel and
+# each HTTP client one pooled session, so a created client is a created channel.
+CLIENT_FACTORIES = {
+    "speech": (create_speech_client, "grpc"),
+    "storage": (_create_storage_client, "http"),
+    "translate": (_create_translate_client, "http"),
+    "tts": (_create_tts_client, "grpc"),
+    "vision": (_create_vision_client, "grpc"),
+}
+
+class ClientRegistry:
+    """
+    Builds each cloud client the first time it is asked for and hands the same
+    instance to every later caller, from any thread, so its channel, auth and TLS
+    session are set up once per process. GCS bucket handles are kept the same way.
+    A forked child starts afresh, since gRPC channels must not cross a fork.
+    """
+
+    def __init__(self, factories=None):
+        self._factories = dict(CLIENT_FACTORIES if factories is None else factories)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._clients = {}
+        self._buckets = {}
+        self.clients_created = Counter()
+        self.channels_created = Counter()
+
+    def get(self, name):
+        """Returns the shared client called name ("speech", "storage", "translate", "tts" or "vision")."""
+        client = self._clients.get(name)
+        if client is not None and self._pid == os.getpid():
+            return client
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            if name not in self._clients:
+                if name not in self._factories:
+                    raise ValueError(f"Unknown client {name!r}; choose from {', '.join(self._factories)}")
+                factory, kind = self._factories[name]
+                with span("client_create", "api", client=name):
+                    self._clients[name] = factory()
+                self.clients_created[name] += 1
+                self.channels_created[kind] += 1
+                logging.info(f"Created {name} client ({kind})")
+            return self._clients[name]
+
+    def bucket(self, bucket_name):
+        """Returns the shared handle for a GCS bucket, built from the shared storage client."""
+        bucket = self._buckets.get(bucket_name)
+        if bucket is not None and self._pid == os.getpid():
+            return bucket
+        storage_client = self.get("storage")
+        with self._lock:
+            if bucket_name not in self._buckets:
+                self._buckets[bucket_name] = storage_client.bucket(bucket_name)
+            return self._buckets[bucket_name]
+
+    def stats(self):
+        """How many clients (by name) and channels (by kind) this process has created."""
+        with self._lock:
+            return {"clients_created": dict(self.clients_created), "channels_created": dict(self.channels_created)}
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+def get_client_registry():
+    """Returns the process-wide registry, creating it on first use."""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = ClientRegistry()
+        return _default_registry
+
+def get_client(name):
+    """Shortcut for get_client_registry().get(name)."""
+    return get_client_registry().get(name)
@@ -1,12 +1,14 @@
-import json
 import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import anime_converter_backend  # Import the first backend file
-import anime_converter_backend2  # Import the second backend file
+from anime_converter_state import get_state_store  # Per-job resumable state
+import anime_converter_tracing  # Optional timing traces, written when ANIME_TRACE_DIR is set
+from anime_converter_progress import ProgressChannel  # Progress from worker threads to the widgets
 import logging
 import threading  # For threading the GUI
-from ocr_subtitle_extractor import extract_subtitles_with_google_vision  # Import the updated OCR script
+# The conversion pipeline and the OCR script pull in moviepy, pydub, the Google
+# client libraries, cv2 and openai; they are imported when their button is used,
+# so the window appears without waiting for them
 
 # Ensure GOOGLE_APPLICATION_CREDENTIALS is set
 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "D:/Anime/credentials.json"
@@ -18,22 +20,6 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-STATE_FILE_PATH = "D:/Anime/state_tracker.json"
-
-def load_state():
-    if os.path.exists(STATE_FILE_PATH):
-        with open(STATE_FILE_PATH, 'r') as f:
-            return json.load(f)
-    return {}
-
-def save_state(state):
-    with open(STATE_FILE_PATH, 'w') as f:
-        json.dump(state, f)
-
-def reset_state():
-    if os.path.exists(STATE_FILE_PATH):
-        os.remove(STATE_FILE_PATH)
-
 def select_japanese_file():
     file_path = filedialog.askopenfilename(
         filetypes=[("Video files", "*.mp4 *.mkv *.avi")]
@@ -48,144 +34,87 @@ def select_output_directory():
         output_directory.set(directory)
         logging.info(f"Selected output directory: {directory}")
 
-def update_progress_bar(progress_bar, status_label, status, progress=0):
-    status_label.config(text=status)
-    progress_bar['value'] = progress
-    root.update_idletasks()
-
 def start_conversion_thread():
-    threading.Thread(target=start_conversion).start()
+    # Tk variables are read here on the main thread; the worker only publishes progress
+    threading.Thread(
+        target=start_conversion, args=(japanese_file_path.get(), output_directory.get(), output_filename.get())
+    ).start()
 
-def start_conversion():
+def start_conversion(video_path, output_dir, output_name):
     try:
-        video_path = japanese_file_path.get()
-        output_dir = output_directory.get()
-        output_name = output_filename.get()
+        import anime_converter_pipeline  # Conversion stages shared with the headless batch_convert.py
 
         if not video_path:
-            messagebox.showerror("Error", "Please select a Japanese video file.")
+            progress_channel.call(messagebox.showerror, "Error", "Please select a Japanese video file.")
             return
         if not output_dir:
-            messagebox.showerror("Error", "Please select an output directory.")
+            progress_channel.call(messagebox.showerror, "Error", "Please select an output directory.")
             return
         if not output_name:
-            messagebox.showerror("Error", "Please enter an output filename.")
+            progress_channel.call(messagebox.showerror, "Error", "Please enter an output filename.")
             return
 
         if not output_name.lower().endswith(('.mp4', '.mkv', '.avi')):
             output_name += '.mp4'  # Default to .mp4 if no valid extension is provided
 
-        state = load_state()
-
-        # Step 1: Extract Audio
-        if not state.get("audio_extracted", False):
-            update_progress_bar(progress_bar_audio_extraction, status_label_audio_extraction, "Extracting audio...", 10)
-            extracted_audio_path = anime_converter_backend.extract_audio(video_path)
-            state["audio_extracted"] = True
-            state["extracted_audio_path"] = extracted_audio_path
-            save_state(state)
-            update_progress_bar(progress_bar_audio_extraction, status_label_audio_extraction, "Audio extraction completed", 100)
-        else:
-            extracted_audio_path = state["extracted_audio_path"]
-
-        # Step 2: Convert to Mono
-        if not state.get("audio_converted_to_mono", False):
-            mono_audio_path = os.path.splitext(extracted_audio_path)[0] + '_mono.wav'
-            anime_converter_backend.convert_to_mono(extracted_audio_path, mono_audio_path)
-            state["audio_converted_to_mono"] = True
-            state["mono_audio_path"] = mono_audio_path
-            save_state(state)
-            update_progress_bar(progress_bar_audio_extraction, status_label_audio_extraction, "Converted to Mono", 100)
-        else:
-            mono_audio_path = state["mono_audio_path"]
-
-        # Step 3: Chunk Audio
-        if not state.get("audio_chunked", False):
-            update_progress_bar(progress_bar_chunking, status_label_chunking, "Chunking audio...", 10)
-            audio_chunks = anime_converter_backend.split_audio_by_size(mono_audio_path)
-            state["audio_chunked"] = True
-            state["audio_chunks"] = audio_chunks
-            save_state(state)
-            update_progress_bar(progress_bar_chunking, status_label_chunking, "Audio chunking completed", 100)
-        else:
-            audio_chunks = state["audio_chunks"]
-
-        # Step 4: Transcribe Audio
-        if not state.get("audio_transcribed", False):
-            update_progress_bar(progress_bar_transcription, status_label_transcription, "Transcribing audio...", 10)
-            transcript = anime_converter_backend2.transcribe_audio(mono_audio_path)
-            state["audio_transcribed"] = True
-            state["transcript"] = transcript
-            save_state(state)
-            update_progress_bar(progress_bar_transcription, status_label_transcription, "Audio transcription completed", 100)
-        else:
-            transcript = state["transcript"]
-
-        # Step 5: Translate Text
-        if not state.get("text_translated", False):
-            update_progress_bar(progress_bar_translation, status_label_translation, "Translating text...", 10)
-            translated_text = anime_converter_backend2.translate_text(transcript)
-            state["text_translated"] = True
-            state["translated_text"] = translated_text
-            save_state(state)
-            update_progress_bar(progress_bar_translation, status_label_translation, "Text translation completed", 100)
-        else:
-            translated_text = state["translated_text"]
-
-        # Step 6: Synthesize Speech
-        if not state.get("speech_synthesized", False):
-            synthesized_audio_path = os.path.join(output_dir, 'synthesized_audio.wav')
-            update_progress_bar(progress_bar_tts, status_label_tts, "Synthesizing speech...", 10)
-            anime_converter_backend2.synthesize_speech(translated_text, synthesized_audio_path)
-            state["speech_synthesized"] = True
-            state["synthesized_audio_path"] = synthesized_audio_path
-            save_state(state)
-            update_progress_bar(progress_bar_tts, status_label_tts, "Speech synthesis completed", 100)
-        else:
-            synthesized_audio_path = state["synthesized_audio_path"]
-
-        # Step 7: Merge Audio and Video
-        if not state.get("audio_video_merged", False):
-            update_progress_bar(progress_bar_merge, status_label_merge, "Merging audio and video...", 10)
-            anime_converter_backend.merge_audio_video(video_path, synthesized_audio_path, os.path.join(output_dir, output_name))
-            state["audio_video_merged"] = True
-            save_state(state)
-            update_progress_bar(progress_bar_merge, status_label_merge, "Merging audio and video completed", 100)
-
-        messagebox.showinfo(
-            "Success",
+        def report_stage(event):
+            if event["status"] != "skipped":
+                progress_channel.publish(event["stage"], event["progress"], event["message"])
+
+        if anime_converter_tracing.TRACE_DIR:
+            anime_converter_tracing.enable_tracing()
+            anime_converter_tracing.reset_tracing()
+        try:
+            anime_converter_pipeline.run_conversion(
+                video_path, os.path.join(output_dir, output_name), output_dir,
+                report=report_stage, state_store=get_state_store()
+            )
+        finally:
+            if anime_converter_tracing.TRACE_DIR:
+                anime_converter_tracing.export_trace(
+                    anime_converter_tracing.TRACE_DIR, prefix=os.path.splitext(output_name)[0]
+                )
+
+        progress_channel.call(
+            messagebox.showinfo, "Success",
             f"Conversion completed successfully!\nOutput saved at:\n{os.path.join(output_dir, output_name)}"
         )
-        reset_state()
 
     except Exception as e:
         logging.error(f"Error during conversion: {str(e)}")
-        messagebox.showerror("Error", f"An error occurred: {str(e)}")
+        progress_channel.call(messagebox.showerror, "Error", f"An error occurred: {str(e)}")
 
 def start_ocr_thread():
-    threading.Thread(target=run_ocr).start()
+    threading.Thread(target=run_ocr, args=(japanese_file_path.get(),)).start()
 
-def run_ocr():
-    video_path = japanese_file_path.get()
+def run_ocr(video_path):
+    try:
+        from ocr_subtitle_extractor import extract_subtitles_with_google_vision
+
+        if not video_path:
+            progress_channel.call(messagebox.showerror, "Error", "Please select a Japanese video file.")
+            return
 
-    if not video_path:
-        messagebox.showerror("Error", "Please select a Japanese video file.")
-        return
+        ocr_progress = progress_channel.reporter("ocr")
+        subtitles = extract_subtitles_with_google_vision(video_path, ocr_progress, ocr_progress)
+        if subtitles:
+            progress_channel.call(messagebox.showinfo, "OCR Complete", "Subtitles extracted successfully.")
+            logging.info("Extracted Subtitles:")
+            logging.info("\n".join(subtitles))
+        else:
+            progress_channel.call(messagebox.showinfo, "OCR Complete", "No subtitles were found in the video.")
 
-    subtitles = extract_subtitles_with_google_vision(video_path)
-    if subtitles:
-        messagebox.showinfo("OCR Complete", "Subtitles extracted successfully.")
-        logging.info("Extracted Subtitles:")
-        logging.info("\n".join(subtitles))
-    else:
-        messagebox.showinfo("OCR Complete", "No subtitles were found in the video.")
+    except Exception as e:
+        logging.error(f"Error during OCR: {str(e)}")
+        progress_channel.call(messagebox.showerror, "Error", f"An error occurred during OCR: {str(e)}")
 
 def main():
-    global root, japanese_file_path, output_directory, output_filename
-    global progress_bar_audio_extraction, progress_bar_chunking, progress_bar_transcription
+    global root, japanese_file_path, output_directory, output_filename, progress_channel
+    global progress_bar_audio_extraction, progress_bar_transcription
     global progress_bar_translation, progress_bar_tts, progress_bar_merge
-    global status_label_audio_extraction, status_label_chunking, status_label_transcription
+    global status_label_audio_extraction, status_label_transcription
     global status_label_translation, status_label_tts, status_label_merge
+    global progress_bar_ocr, status_label_ocr
 
     root = tk.Tk()
     root.title("Anime Converter")
@@ -217,11 +146,6 @@ def main():
     progress_bar_audio_extraction = ttk.Progressbar(root, length=700, mode='determinate')
     progress_bar_audio_extraction.pack(pady=(5, 0))
 
-    status_label_chunking = tk.Label(root, text="Chunking: Not Started")
-    status_label_chunking.pack(pady=(10, 0))
-    progress_bar_chunking = ttk.Progressbar(root, length=700, mode='determinate')
-    progress_bar_chunking.pack(pady=(5, 0))
-
     status_label_transcription = tk.Label(root, text="Transcription: Not Started")
     status_label_transcription.pack(pady=(10, 0))
     progress_bar_transcription = ttk.Progressbar(root, length=700, mode='determinate')
@@ -242,6 +166,22 @@ def main():
     progress_bar_merge = ttk.Progressbar(root, length=700, mode='determinate')
     progress_bar_merge.pack(pady=(5, 0))
 
+    status_label_ocr = tk.Label(root, text="Subtitle OCR: Not Started")
+    status_label_ocr.pack(pady=(10, 0))
+    progress_bar_ocr = ttk.Progressbar(root, length=700, mode='determinate')
+    progress_bar_ocr.pack(pady=(5, 0))
+
+    # Worker threads publish per-stage progress; the main loop applies it a few times a second
+    progress_channel = ProgressChannel(root, {
+        "extract": (progress_bar_audio_extraction, status_label_audio_extraction),
+        "transcribe": (progress_bar_transcription, status_label_transcription),
+        "translate": (progress_bar_translation, status_label_translation),
+        "synthesize": (progress_bar_tts, status_label_tts),
+        "merge": (progress_bar_merge, status_label_merge),
+        "ocr": (progress_bar_ocr, status_label_ocr),
+    })
+    progress_channel.start()
+
     # Start Conversion Button
     start_button = tk.Button(root, text="Start Conversion", command=start_conversion_thread, bg="green", fg="white", width=25)
     start_button.pack(pady=20)  # Ensure that the button is visible and properly packed
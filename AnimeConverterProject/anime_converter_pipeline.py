@@ -0,0 +1,176 @@
+import os
+import time
+import logging
+import anime_converter_backend2
+from anime_converter_tracing import span
+from anime_converter_utils import (extract_audio_for_recognition, get_wav_duration, merge_audio_video,
+                                   RECOGNITION_SAMPLE_RATE)
+
+# Stage name -> (message while running, message when done), in pipeline order
+STAGES = {
+    "extract": ("Extracting audio...", "Audio extraction completed (mono)"),
+    "transcribe": ("Transcribing audio...", "Audio transcription completed"),
+    "translate": ("Translating text...", "Text translation completed"),
+    "synthesize": ("Synthesizing speech...", "Speech synthesis completed"),
+    "merge": ("Merging audio and video...", "Merging audio and video completed"),
+}
+
+# Everything besides the input video that changes what a conversion produces;
+# part of the job key, so changing any of these starts a fresh job
+PIPELINE_PARAMS = {
+    "recognition_sample_rate": RECOGNITION_SAMPLE_RATE,
+    "source_language": "ja-JP",
+    "target_language": "en",
+    "tts_voice": "en-US/NEUTRAL",
+    "tts_sample_rate": anime_converter_backend2.TTS_SAMPLE_RATE,
+    "trim_silence": anime_converter_backend2.TRIM_SILENCE,
+    "recognition_mode": anime_converter_backend2.RECOGNITION_MODE,
+}
+
+# Which resource pool each stage's work belongs to when episodes run side by side
+STAGE_RESOURCES = {
+    "extract": "cpu",
+    "transcribe": "cloud",
+    "translate": "cloud",
+    "synthesize": "cloud",
+    "merge": "cpu",
+}
+
+def _call_directly(stage, func, *args, **kwargs):
+    return func(*args, **kwargs)
+
+def _traced(run_stage):
+    # Times every stage, whichever pool run_stage hands it to
+    def run_traced_stage(stage, func, *args, **kwargs):
+        with span(stage, "stage"):
+            return run_stage(stage, func, *args, **kwargs)
+    return run_traced_stage
+
+def _report_stage(report, stage, status, started_at=None, **details):
+    if report is None:
+        return
+    event = dict(details, stage=stage, status=status)
+    if status == "started":
+        event.update(message=STAGES[stage][0], progress=10)
+    else:
+        event.update(message=STAGES[stage][1], progress=100)
+    if started_at is not None:
+        event["seconds"] = round(time.time() - started_at, 3)
+    report(event)
+
+def run_conversion(video_path, output_video_path, work_dir=None, state=None, save_state=None, report=None,
+                   run_stage=None, state_store=None):
+    """
+    Runs extract -> transcribe -> translate -> synthesize -> merge for one video.
+    state holds finished stages and their outputs (the same keys the GUI has always
+    saved) and is passed to save_state after every stage so a rerun resumes.
+    report, if given, receives a dict per stage transition with "stage", "status"
+    ("started", "completed" or "skipped"), "message", "progress" and "seconds"; the
+    transcribe "completed" event also carries "removed_fraction", the share of audio
+    cut as non-speech before recognition.
+    run_stage(stage, func, *args, **kwargs), if given, performs each stage's work;
+    the scheduler uses it to route stages to its CPU and cloud pools.
+    With state_store (a JobStateStore), state is loaded from and saved to the job
+    for this video and output, and chunks, translations and synthesized segments
+    are recorded individually so an interrupted stage resumes where it stopped.
+    A job that already completed starts over, and a finished stage is redone when
+    a file it produced (or the output video) has since been removed.
+    """
+    run_stage = _traced(run_stage or _call_directly)
+    units = None
+    if state_store is not None:
+        job_params = dict(PIPELINE_PARAMS, output_video_path=os.path.abspath(output_video_path))
+        job_id = state_store.job_id_for(video_path, job_params)
+        state = state_store.open_job(job_id, video_path, job_params)
+        save_state = lambda state: state_store.save_state(job_id, state)
+        units = state_store.units_for(job_id)
+        logging.info(f"Job {job_id} for {video_path}: finished stages {[key for key, done in state.items() if done is True]}")
+    state = {} if state is None else state
+    save_state = save_state or (lambda state: None)
+    work_dir = work_dir or os.path.dirname(os.path.abspath(output_video_path))
+    stem = os.path.splitext(os.path.basename(video_path))[0]
+
+    def stage_done(key, stage, *output_paths):
+        # A finished stage is only skipped while the files it produced are still there
+        if state.get(key, False) and all(path and os.path.exists(path) for path in output_paths):
+            _report_stage(report, stage, "skipped")
+            return True
+        return False
+
+    # Steps 1-2: Extract audio straight to 16 kHz mono in a single ffmpeg pass
+    if not stage_done("audio_converted_to_mono", "extract", state.get("mono_audio_path")):
+        started_at = time.time()
+        _report_stage(report, "extract", "started")
+        mono_audio_path = run_stage(
+            "extract", extract_audio_for_recognition,
+            video_path, os.path.join(work_dir, f"{stem}_extracted_audio_mono.wav")
+        )
+        state["audio_extracted"] = True
+        state["extracted_audio_path"] = mono_audio_path
+        state["audio_converted_to_mono"] = True
+        state["mono_audio_path"] = mono_audio_path
+        save_state(state)
+        _report_stage(report, "extract", "completed", started_at)
+    mono_audio_path = state["mono_audio_path"]
+
+    # Step 3: Transcribe Audio into timed segments (trimming and chunking happen inside)
+    if not stage_done("audio_transcribed", "transcribe"):
+        started_at = time.time()
+        _report_stage(report, "transcribe", "started")
+        transcribe_stats = {}
+        if anime_converter_backend2.RECOGNITION_MODE == "streaming":
+            # Streams the local file with no GCS upload; a stream can't resume midway, so no units
+            state["segments"] = run_stage(
+                "transcribe", anime_converter_backend2.transcribe_audio_segments_streaming, mono_audio_path,
+                stats=transcribe_stats
+            )
+        else:
+            state["segments"] = run_stage(
+                "transcribe", anime_converter_backend2.transcribe_audio_segments, mono_audio_path, units=units,
+                stats=transcribe_stats
+            )
+        state["audio_transcribed"] = True
+        save_state(state)
+        _report_stage(report, "transcribe", "completed", started_at, **transcribe_stats)
+
+    # Step 4: Translate each segment
+    if not stage_done("text_translated", "translate"):
+        started_at = time.time()
+        _report_stage(report, "translate", "started")
+        state["segments"] = run_stage(
+            "translate", anime_converter_backend2.translate_segments, state["segments"], units=units
+        )
+        state["text_translated"] = True
+        save_state(state)
+        _report_stage(report, "translate", "completed", started_at)
+
+    # Step 5: Synthesize each segment and place it at its original timestamp
+    if not stage_done("speech_synthesized", "synthesize", state.get("synthesized_audio_path")):
+        started_at = time.time()
+        _report_stage(report, "synthesize", "started")
+        synthesized_audio_path = os.path.join(work_dir, f"{stem}_synthesized_audio.wav")
+        total_duration = get_wav_duration(mono_audio_path)
+        run_stage(
+            "synthesize", anime_converter_backend2.synthesize_segments,
+            state["segments"], synthesized_audio_path, total_duration, units=units
+        )
+        state["speech_synthesized"] = True
+        state["synthesized_audio_path"] = synthesized_audio_path
+        save_state(state)
+        _report_stage(report, "synthesize", "completed", started_at)
+
+    # Step 6: Merge Audio and Video
+    if not stage_done("audio_video_merged", "merge", output_video_path):
+        started_at = time.time()
+        _report_stage(report, "merge", "started")
+        run_stage("merge", merge_audio_video, video_path, state["synthesized_audio_path"], output_video_path)
+        state["audio_video_merged"] = True
+        save_state(state)
+        _report_stage(report, "merge", "completed", started_at)
+
+    # Nothing resumes a finished conversion, so the trim and chunk files can go
+    anime_converter_backend2.remove_transcription_files(mono_audio_path)
+    if state_store is not None:
+        state_store.mark_completed(job_id)
+    logging.info(f"Conversion of {video_path} completed: {output_video_path}")
+    return output_video_path
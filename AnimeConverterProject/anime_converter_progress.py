@@ -0,0 +1,96 @@
+import queue
+import logging
+import threading
+
+# How often the Tk main loop applies published progress; redraws never exceed this rate
+PROGRESS_POLL_MS = 100
+
+class ProgressChannel:
+    """
+    Carries progress from worker threads to Tk widgets without touching Tk off the
+    main thread. Workers publish(stage, value, text); only the latest value and
+    text per stage are kept until the next drain, so publishing never blocks on UI
+    work and never piles up. start() has the Tk main loop drain every poll_ms via
+    root.after, so redraw cost is bounded however often workers publish.
+    """
+
+    def __init__(self, root, widgets, poll_ms=PROGRESS_POLL_MS):
+        self.root = root
+        self.widgets = widgets  # Stage -> (progress_bar, status_label)
+        self.poll_ms = poll_ms
+        self.published = 0
+        self.applied = 0
+        self._lock = threading.Lock()
+        self._latest = {}
+        self._calls = queue.SimpleQueue()
+
+    def publish(self, stage, value=None, text=None):
+        """Records the stage's latest progress value and/or status text; safe from any thread."""
+        with self._lock:
+            update = self._latest.setdefault(stage, {})
+            if value is not None:
+                update["value"] = value
+            if text is not None:
+                update["text"] = text
+            self.published += 1
+
+    def call(self, func, *args, **kwargs):
+        """Runs func(*args, **kwargs) on the Tk main thread at the next drain, e.g. a message box."""
+        self._calls.put((func, args, kwargs))
+
+    def reporter(self, stage):
+        """A StageProgress for stage, to hand to worker code in place of its widgets."""
+        return StageProgress(self, stage)
+
+    def start(self):
+        self.root.after(self.poll_ms, self._poll)
+
+    def drain(self):
+        """Applies everything published since the last drain. Main thread only."""
+        with self._lock:
+            latest, self._latest = self._latest, {}
+        for stage, update in latest.items():
+            if stage not in self.widgets:
+                # Don't let one unknown stage drop the other stages' updates or the queued calls
+                logging.warning(f"Progress published for unknown stage {stage!r}; ignored")
+                continue
+            progress_bar, status_label = self.widgets[stage]
+            if "value" in update:
+                progress_bar['value'] = update["value"]
+            if "text" in update:
+                status_label.config(text=update["text"])
+            self.applied += 1
+        while True:
+            try:
+                func, args, kwargs = self._calls.get_nowait()
+            except queue.Empty:
+                break
+            func(*args, **kwargs)
+
+    def _poll(self):
+        try:
+            self.drain()
+        except Exception as e:
+            logging.error(f"Error applying progress: {e}")
+        finally:
+            self.root.after(self.poll_ms, self._poll)
+
+class StageProgress:
+    """
+    Stands in for one stage's progress bar and status label in worker code:
+    stage['value'] = 40 and stage.config(text=...) publish to the channel instead
+    of touching Tk, so code written against widgets, or against the backends'
+    update_progress dicts, works unchanged.
+    """
+
+    def __init__(self, channel, stage):
+        self.channel = channel
+        self.stage = stage
+
+    def __setitem__(self, key, value):
+        if key != 'value':
+            raise KeyError(key)
+        self.channel.publish(self.stage, value=value)
+
+    def config(self, text=None, **options):
+        self.channel.publish(self.stage, text=text)
@@ -0,0 +1,61 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import anime_converter_pipeline
+from anime_converter_pipeline import STAGE_RESOURCES
+
+# Episodes in progress at once; enough that one is usually in a CPU stage while another waits on the cloud
+DEFAULT_MAX_EPISODES = 3
+DEFAULT_CPU_WORKERS = os.cpu_count() or 1
+# Episodes allowed in a cloud stage at once (each stage already fans out its own requests)
+DEFAULT_CLOUD_SLOTS = 2
+
+def _run_episode(job, run_stage, report, state_store):
+    """Runs one (video_path, output_video_path, work_dir) job and returns its result dict."""
+    video_path, output_video_path, work_dir = job
+    started_at = time.time()
+
+    def report_event(event):
+        if report:
+            report(video_path, event)
+
+    try:
+        anime_converter_pipeline.run_conversion(
+            video_path, output_video_path, work_dir, report=report_event, run_stage=run_stage,
+            state_store=state_store
+        )
+        return {"video": video_path, "status": "ok", "output": output_video_path,
+                "seconds": round(time.time() - started_at, 3)}
+    except Exception as e:
+        logging.exception(f"Conversion of {video_path} failed")
+        return {"video": video_path, "status": "failed", "error": str(e),
+                "seconds": round(time.time() - started_at, 3)}
+
+def run_episodes(jobs, max_episodes=DEFAULT_MAX_EPISODES, cpu_workers=DEFAULT_CPU_WORKERS,
+                 cloud_slots=DEFAULT_CLOUD_SLOTS, report=None, state_store=None):
+    """
+    Converts several episodes at once so CPU and network stages overlap: while one
+    episode waits on transcription, the next can already be extracting audio.
+    CPU stages (extract, merge) run in a thread pool of cpu_workers; cloud
+    stages (transcribe, translate, synthesize) are limited to cloud_slots episodes.
+    jobs is a list of (video_path, output_video_path, work_dir). report(video_path, event)
+    receives each stage event. With state_store (a JobStateStore) every episode resumes
+    from its own job state. Returns one result dict per job, in job order.
+    """
+    cloud_semaphore = threading.BoundedSemaphore(max(1, cloud_slots))
+
+    # Threads, not processes: the CPU stages are ffmpeg subprocesses and file I/O, and forking
+    # a process that already runs episode threads and gRPC clients can deadlock the children
+    with ThreadPoolExecutor(max_workers=max(1, cpu_workers)) as cpu_pool, \
+            ThreadPoolExecutor(max_workers=max(1, max_episodes)) as episode_pool:
+
+        def run_stage(stage, func, *args, **kwargs):
+            if STAGE_RESOURCES[stage] == "cpu":
+                return cpu_pool.submit(func, *args, **kwargs).result()
+            with cloud_semaphore:
+                return func(*args, **kwargs)
+
+        futures = [episode_pool.submit(_run_episode, job, run_stage, report, state_store) for job in jobs]
+        return [future.result() for future in futures]
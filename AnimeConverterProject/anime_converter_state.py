@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+STATE_DB_PATH = os.getenv("ANIME_STATE_DB", "D:/Anime/state.sqlite3")
+HASH_BLOCK_BYTES = 1024 * 1024
+
+def hash_file(path):
+    """SHA-256 of a file's contents, read in blocks so large episodes don't load into memory."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class JobStateStore:
+    """
+    SQLite-backed conversion state, replacing the single global state_tracker.json.
+    Each job is keyed by a hash of the input video's contents plus the pipeline
+    parameters, so concurrent conversions never share state. Besides the stage-level
+    state dict, individual units of work (chunks, segments, frame batches) are recorded
+    as they finish so a rerun resumes at the exact unit that failed.
+    """
+
+    def __init__(self, db_path=STATE_DB_PATH):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        # One connection shared by this process's threads; WAL lets other processes read while we write
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY, video_path TEXT, params TEXT, state TEXT,"
+                " completed INTEGER DEFAULT 0, updated_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS units ("
+                " job_id TEXT, kind TEXT, unit_key TEXT, output TEXT, completed_at REAL,"
+                " PRIMARY KEY (job_id, kind, unit_key))"
+            )
+
+    @staticmethod
+    def job_id_for(video_path, params):
+        """Hash of the video's contents plus every pipeline parameter."""
+        digest = hashlib.sha256()
+        digest.update(hash_file(video_path).encode('utf-8'))
+        digest.update(json.dumps(params, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def open_job(self, job_id, video_path, params, force=False):
+        """
+        Registers the job if new and returns its saved stage-level state dict.
+        A job that already completed (or any job, with force) starts again from an
+        empty state with its recorded units forgotten, so a rerun really converts.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (job_id, video_path, params, state, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, video_path, json.dumps(params, sort_keys=True), "{}", time.time())
+            )
+            state, completed = self._conn.execute(
+                "SELECT state, completed FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if completed or force:
+                self._conn.execute(
+                    "UPDATE jobs SET state = '{}', completed = 0, updated_at = ? WHERE job_id = ?", (time.time(), job_id)
+                )
+                self._conn.execute("DELETE FROM units WHERE job_id = ?", (job_id,))
+                state = "{}"
+        return json.loads(state)
+
+    def save_state(self, job_id, state):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, updated_at = ? WHERE job_id = ?",
+                (json.dumps(state), time.time(), job_id)
+            )
+
+    def mark_completed(self, job_id):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE jobs SET completed = 1, updated_at = ? WHERE job_id = ?", (time.time(), job_id))
+
+    def get_unit(self, job_id, kind, unit_key):
+        """Returns the recorded output of a finished unit, or None if it hasn't finished."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT output FROM units WHERE job_id = ? AND kind = ? AND unit_key = ?",
+                (job_id, kind, str(unit_key))
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put_unit(self, job_id, kind, unit_key, output):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO units (job_id, kind, unit_key, output, completed_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, kind, str(unit_key), json.dumps(output), time.time())
+            )
+
+    def clear_units(self, job_id, kind):
+        """Forgets a kind of unit for a job, e.g. when a stage's inputs change."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM units WHERE job_id = ? AND kind = ?", (job_id, kind))
+
+    def units_for(self, job_id):
+        return JobUnits(self, job_id)
+
+class JobUnits:
+    """A JobStateStore bound to one job, handed to stages that record per-unit progress."""
+
+    def __init__(self, store, job_id):
+        self.store = store
+        self.job_id = job_id
+
+    def get(self, kind, unit_key):
+        return self.store.get_unit(self.job_id, kind, unit_key)
+
+    def put(self, kind, unit_key, output):
+        self.store.put_unit(self.job_id, kind, unit_key, output)
+
+    def clear(self, kind):
+        self.store.clear_units(self.job_id, kind)
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def get_state_store():
+    """Returns the process-wide state store, opening it on first use."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = JobStateStore()
+            logging.info(f"Opened job state store at {_default_store.db_path}")
+        return _default_store
@@ -0,0 +1,114 @@
+import logging
+from collections import Counter
+
+# Readings at least this similar (1 - edit distance / longer length) belong to the same line;
+# absorbs one- or two-character OCR jitter on typical subtitle lines
+SUBTITLE_MERGE_SIMILARITY = 0.8
+
+def edit_distance(a, b):
+    """Levenshtein distance between two strings."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(
+                previous[j] + 1,  # Deletion
+                current[j - 1] + 1,  # Insertion
+                previous[j - 1] + (char_a != char_b)  # Substitution
+            ))
+        previous = current
+    return previous[-1]
+
+def text_similarity(a, b):
+    """1.0 for identical strings, falling towards 0.0 as the edit distance grows."""
+    if not a and not b:
+        return 1.0
+    return 1.0 - edit_distance(a, b) / max(len(a), len(b))
+
+class SubtitleEventMerger:
+    """
+    Turns time-ordered OCR readings into subtitle events. Each reading holds until
+    the next one (frames in between were skipped because the subtitle band didn't
+    change). Consecutive readings at least `similarity` alike are merged into one
+    event whose text is the most frequent reading; an empty reading ends the event.
+    """
+
+    def __init__(self, fps, similarity=SUBTITLE_MERGE_SIMILARITY):
+        self.fps = fps or 25.0
+        self.similarity = similarity
+        self.events = []
+        self.readings = 0
+        self.distinct_characters = 0  # What keeping every reading that differs from the last would send on
+        self._last_text = ""
+        self._start_frame = None
+        self._texts = []
+
+    def add(self, frame_index, text):
+        self.readings += 1
+        if text and text != self._last_text:
+            self.distinct_characters += len(text)
+            self._last_text = text
+        if self._texts and text and text_similarity(text, self._texts[-1]) >= self.similarity:
+            self._texts.append(text)
+            return
+        self._close(frame_index)
+        if text:
+            self._start_frame = frame_index
+            self._texts = [text]
+
+    def finish(self, end_frame):
+        """Closes the last event at end_frame (the video's frame count) and returns all events."""
+        self._close(end_frame)
+        return self.events
+
+    def _close(self, end_frame):
+        if self._texts:
+            self.events.append({
+                "start": self._start_frame / self.fps,
+                "end": end_frame / self.fps,
+                "text": Counter(self._texts).most_common(1)[0][0],
+                "readings": len(self._texts),
+            })
+        self._start_frame = None
+        self._texts = []
+
+def _srt_time(seconds):
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+
+def _ass_time(seconds):
+    centiseconds = int(round(seconds * 100))
+    hours, centiseconds = divmod(centiseconds, 360000)
+    minutes, centiseconds = divmod(centiseconds, 6000)
+    seconds, centiseconds = divmod(centiseconds, 100)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}.{centiseconds:02d}"
+
+def write_srt(events, output_path):
+    """Writes events ({"start", "end", "text"} in seconds) as a SubRip file."""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for number, event in enumerate(events, start=1):
+            f.write(f"{number}\n{_srt_time(event['start'])} --> {_srt_time(event['end'])}\n{event['text']}\n\n")
+    logging.info(f"Wrote {len(events)} subtitles to {output_path}")
+
+def write_ass(events, output_path, font_size=48):
+    """Writes events as an Advanced SubStation Alpha file with one default style."""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(
+            "[Script Info]\nScriptType: v4.00+\nPlayResX: 1920\nPlayResY: 1080\n\n"
+            "[V4+ Styles]\n"
+            "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, "
+            "Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+            "Alignment, MarginL, MarginR, MarginV, Encoding\n"
+            f"Style: Default,Arial,{font_size},&H00FFFFFF,&H000000FF,&H00000000,&H64000000,0,0,0,0,100,100,0,0,"
+            "1,2,1,2,20,20,40,1\n\n"
+            "[Events]\nFormat: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+        )
+        for event in events:
+            text = event['text'].replace('\n', '\\N')  # ASS line break
+            f.write(f"Dialogue: 0,{_ass_time(event['start'])},{_ass_time(event['end'])},Default,,0,0,0,,{text}\n")
+    logging.info(f"Wrote {len(events)} subtitles to {output_path}")
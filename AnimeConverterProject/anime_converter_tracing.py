@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import logging
+import threading
+
+# Tracing is off unless enabled; set ANIME_TRACE_DIR to have the GUI and CLI write traces there
+TRACE_DIR = os.getenv("ANIME_TRACE_DIR")
+
+_enabled = False
+_events = []
+_events_lock = threading.Lock()
+_origin = time.perf_counter()
+
+class _NullSpan:
+    """Returned by span() while tracing is off, so instrumented code costs one call and a with-block."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def add(self, **counters):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class Span:
+    """Times a block and carries bytes_in / bytes_out / items (or any other) counters."""
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def add(self, **counters):
+        for key, value in counters.items():
+            self.args[key] = self.args.get(key, 0) + value
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        event = {
+            "name": self.name,
+            "cat": self.category,
+            "ph": "X",  # Complete event: start + duration
+            "ts": (self.start - _origin) * 1e6,
+            "dur": (end - self.start) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": self.args,
+        }
+        with _events_lock:
+            _events.append(event)
+        return False
+
+def span(name, category="stage", **args):
+    """
+    with span("upload", "api", chunk=3) as s: ...; s.add(bytes_out=len(data))
+    Categories used: stage (pipeline steps), chunk / frame (units of work), api (cloud calls).
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name, category, dict(args))
+
+def enable_tracing():
+    global _enabled
+    _enabled = True
+
+def disable_tracing():
+    global _enabled
+    _enabled = False
+
+def tracing_enabled():
+    return _enabled
+
+def reset_tracing():
+    with _events_lock:
+        _events.clear()
+
+def get_events():
+    with _events_lock:
+        return list(_events)
+
+def summarize(events=None):
+    """Totals wall time and counters per (category, name)."""
+    summary = {}
+    for event in get_events() if events is None else events:
+        entry = summary.setdefault(f"{event['cat']}/{event['name']}", {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+        seconds = event["dur"] / 1e6
+        entry["count"] += 1
+        entry["seconds"] += seconds
+        entry["max_seconds"] = max(entry["max_seconds"], seconds)
+        for key, value in event["args"].items():
+            if key in ("bytes_in", "bytes_out", "items"):
+                entry[key] = entry.get(key, 0) + value
+    for entry in summary.values():
+        entry["seconds"] = round(entry["seconds"], 6)
+        entry["max_seconds"] = round(entry["max_seconds"], 6)
+    return summary
+
+def export_trace(output_dir, prefix="trace"):
+    """
+    Writes <prefix>_summary.json and <prefix>_chrome.json (loadable in chrome://tracing
+    or Perfetto) to output_dir and returns both paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    events = get_events()
+    summary_path = os.path.join(output_dir, f"{prefix}_summary.json")
+    chrome_path = os.path.join(output_dir, f"{prefix}_chrome.json")
+    with open(summary_path, 'w') as f:
+        json.dump(summarize(events), f, indent=2, sort_keys=True)
+    with open(chrome_path, 'w') as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    logging.info(f"Wrote {len(events)} trace events to {chrome_path} and summary to {summary_path}")
+    return summary_path, chrome_path
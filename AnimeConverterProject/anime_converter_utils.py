@@ -1,43 +1,370 @@
+import io
 import os
+import re
 import logging
-from moviepy.editor import VideoFileClip, AudioFileClip
-from pydub import AudioSegment
+import subprocess
+import wave
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from anime_converter_tracing import span
 
-from pydub import AudioSegment
-import logging
+# WAV files written by moviepy/pydub use the canonical 44-byte RIFF header
+WAV_HEADER_BYTES = 44
+# Frames copied per read when streaming a chunk out of the source WAV
+STREAM_BLOCK_FRAMES = 65536
+_SAMPLE_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+def _find_quiet_frame(wav_file, window_start, window_end, analysis_frames):
+    """
+    Returns the frame index at the centre of the lowest-energy analysis window
+    between window_start and window_end, or window_end if it can't be analysed.
+    """
+    dtype = _SAMPLE_DTYPES.get(wav_file.getsampwidth())
+    if dtype is None or window_end - window_start < analysis_frames:
+        return window_end
+
+    wav_file.setpos(window_start)
+    samples = np.frombuffer(wav_file.readframes(window_end - window_start), dtype=dtype)
+    samples = samples.reshape(-1, wav_file.getnchannels()).astype(np.float32)
+    if dtype is np.uint8:
+        samples -= 128.0  # 8-bit WAV is unsigned
+    mono = samples.mean(axis=1)
+
+    window_count = len(mono) // analysis_frames
+    energy = np.square(mono[:window_count * analysis_frames]).reshape(window_count, analysis_frames).mean(axis=1)
+    quietest = int(np.argmin(energy))
+    return window_start + quietest * analysis_frames + analysis_frames // 2
+
+def compute_chunk_boundaries(wav_file, max_size_bytes=10485760, snap_to_silence=False, search_window_ms=500):
+    """
+    Works out (start_frame, end_frame) pairs so that every chunk, header included,
+    fits in max_size_bytes. Only the header is needed unless snap_to_silence is set,
+    in which case each boundary is pulled back to the quietest point within
+    search_window_ms so a word is not cut in half.
+    """
+    frame_rate = wav_file.getframerate()
+    frame_size = wav_file.getnchannels() * wav_file.getsampwidth()
+    total_frames = wav_file.getnframes()
+
+    max_frames = (max_size_bytes - WAV_HEADER_BYTES) // frame_size
+    if max_frames <= 0:
+        raise ValueError(f"max_size_bytes={max_size_bytes} is too small to hold a single audio frame")
 
-def split_audio_by_size(audio_path, max_size_bytes=10485760):
-    audio = AudioSegment.from_wav(audio_path)
+    search_frames = min(int(frame_rate * search_window_ms / 1000), max_frames // 2)
+    analysis_frames = max(frame_rate // 100, 1)  # 10 ms energy windows
+
+    boundaries = []
+    start = 0
+    while start < total_frames:
+        end = min(start + max_frames, total_frames)
+        if snap_to_silence and end < total_frames and search_frames > 0:
+            end = _find_quiet_frame(wav_file, end - search_frames, end, analysis_frames)
+        boundaries.append((start, end))
+        start = end
+
+    return boundaries
+
+def split_audio_by_size(audio_path, max_size_bytes=10485760, snap_to_silence=False, search_window_ms=500):
+    """
+    Splits a WAV file into chunks no larger than max_size_bytes.
+    Boundaries come from the WAV header alone and each chunk is streamed to disk
+    in fixed-size blocks, so memory use stays flat regardless of episode length.
+    """
     chunks = []
-    current_start = 0
-    while current_start < len(audio):
-        # Start with a small chunk
-        chunk_duration_ms = 1000  # 1 second
-        chunk = audio[current_start:current_start + chunk_duration_ms]
-        current_size = len(chunk.raw_data)
-        
-        # Increase the chunk size until it is just under the max limit
-        while current_size < max_size_bytes and (current_start + chunk_duration_ms) < len(audio):
-            chunk_duration_ms += 1000  # increase by 1 second
-            chunk = audio[current_start:current_start + chunk_duration_ms]
-            current_size = len(chunk.raw_data)
-
-        # If chunk size exceeds the max limit, use the previous valid chunk
-        if current_size > max_size_bytes:
-            chunk_duration_ms -= 1000
-            chunk = audio[current_start:current_start + chunk_duration_ms]
-
-        chunk_path = f"{audio_path}_chunk_{len(chunks)}.wav"
-        chunk.export(chunk_path, format="wav")
-        chunks.append(chunk_path)
-        logging.info(f"Created chunk {chunk_path}")
-
-        current_start += chunk_duration_ms
+    with wave.open(audio_path, 'rb') as source:
+        params = source.getparams()
+        boundaries = compute_chunk_boundaries(source, max_size_bytes, snap_to_silence, search_window_ms)
+
+        for index, (start_frame, end_frame) in enumerate(boundaries):
+            chunk_path = f"{audio_path}_chunk_{index}.wav"
+            source.setpos(start_frame)
+            with span("write_chunk", "chunk", chunk=index) as chunk_span, wave.open(chunk_path, 'wb') as chunk:
+                chunk.setparams(params)
+                remaining = end_frame - start_frame
+                while remaining > 0:
+                    block = min(remaining, STREAM_BLOCK_FRAMES)
+                    chunk.writeframesraw(source.readframes(block))
+                    remaining -= block
+                chunk_span.add(bytes_out=(end_frame - start_frame) * params.nchannels * params.sampwidth)
+            chunks.append(chunk_path)
+            logging.info(f"Created chunk {chunk_path} (frames {start_frame}-{end_frame})")
 
     return chunks
 
 
+def get_wav_duration(audio_path):
+    """Returns the length of a WAV file in seconds, from its header."""
+    with wave.open(audio_path, 'rb') as wav_file:
+        return wav_file.getnframes() / wav_file.getframerate()
+
+# Voice-activity trimming: each short window's level is compared to the episode's own noise floor
+VAD_WINDOW_MS = 30
+VAD_MARGIN_DB = 10.0  # Speech must be this far above the noise floor (10th percentile level)...
+VAD_MIN_DB = -50.0  # ...and above this absolute level in dBFS
+VAD_MIN_SPEECH_MS = 200  # Shorter bursts (clicks, hits) are dropped
+VAD_MAX_GAP_MS = 500  # Pauses shorter than this stay inside a speech span
+VAD_PADDING_MS = 200  # Kept either side of each span so word edges aren't clipped
+VAD_JOIN_GAP_MS = 300  # Silence put between kept spans so the recognizer still hears a pause
+
+def _window_levels_db(wav_file, window_frames):
+    """Returns the RMS level in dBFS of each window of a 16-bit WAV, read block by block."""
+    channels = wav_file.getnchannels()
+    block_frames = max(1, STREAM_BLOCK_FRAMES // window_frames) * window_frames
+    levels = []
+    wav_file.rewind()
+    while True:
+        data = wav_file.readframes(block_frames)
+        if not data:
+            break
+        samples = np.frombuffer(data, dtype='<i2').astype(np.float32).reshape(-1, channels).mean(axis=1)
+        window_count = -(-len(samples) // window_frames)  # The last window may be short
+        padded = np.zeros(window_count * window_frames, dtype=np.float32)
+        padded[:len(samples)] = samples
+        levels.append(np.sqrt(np.square(padded.reshape(window_count, window_frames)).mean(axis=1)))
+    if not levels:
+        return np.zeros(0)
+    return 20 * np.log10(np.maximum(np.concatenate(levels), 1.0) / 32768.0)
+
+def detect_speech_spans(audio_path, margin_db=VAD_MARGIN_DB, min_db=VAD_MIN_DB, min_speech_ms=VAD_MIN_SPEECH_MS,
+                        max_gap_ms=VAD_MAX_GAP_MS, padding_ms=VAD_PADDING_MS):
+    """
+    Returns (start_frame, end_frame) pairs of a 16-bit WAV that hold speech, judged
+    by energy: windows louder than both the noise floor plus margin_db and min_db.
+    Audio with too little dynamic range to tell speech from background is kept whole.
+    """
+    with wave.open(audio_path, 'rb') as wav_file:
+        if wav_file.getsampwidth() != 2:
+            raise ValueError(f"{audio_path} must be 16-bit PCM for speech detection")
+        frame_rate = wav_file.getframerate()
+        total_frames = wav_file.getnframes()
+        window_frames = max(1, frame_rate * VAD_WINDOW_MS // 1000)
+        levels = _window_levels_db(wav_file, window_frames)
+
+    if len(levels) == 0:
+        return []
+    noise_floor = np.percentile(levels, 10)
+    if np.percentile(levels, 90) - noise_floor < margin_db:
+        logging.info(f"No quiet background to measure speech against in {audio_path}; keeping all audio")
+        return [(0, total_frames)]
+    voiced = levels > max(min_db, noise_floor + margin_db)
+
+    # Runs of voiced windows as [start_window, end_window)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+    window_ms = window_frames * 1000 / frame_rate
+    runs = []
+    for start, end in edges.reshape(-1, 2):
+        if runs and (start - runs[-1][1]) * window_ms <= max_gap_ms:
+            runs[-1][1] = end  # Bridge a short pause
+        else:
+            runs.append([start, end])
+
+    padding_frames = int(frame_rate * padding_ms / 1000)
+    spans = []
+    for start, end in runs:
+        if (end - start) * window_ms < min_speech_ms:
+            continue
+        start_frame = max(0, int(start) * window_frames - padding_frames)
+        end_frame = min(total_frames, int(end) * window_frames + padding_frames)
+        if spans and start_frame <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], end_frame)  # Padding made neighbours overlap
+        else:
+            spans.append((start_frame, end_frame))
+    return spans
+
+def trim_to_speech(audio_path, output_audio_path=None, spans=None, join_gap_ms=VAD_JOIN_GAP_MS):
+    """
+    Writes only the speech spans of audio_path (detect_speech_spans unless given),
+    separated by join_gap_ms of silence, streaming block by block. Returns
+    (output_audio_path, offset_map, removed_fraction), where offset_map lists
+    [trimmed_start, original_start, duration] in seconds for map_to_original_time.
+    """
+    if output_audio_path is None:
+        output_audio_path = f"{os.path.splitext(audio_path)[0]}_speech.wav"
+    if spans is None:
+        spans = detect_speech_spans(audio_path)
+
+    offset_map = []
+    with wave.open(audio_path, 'rb') as source, wave.open(output_audio_path, 'wb') as output:
+        params = source.getparams()
+        frame_rate = params.framerate
+        output.setparams(params)
+        gap_frames = int(frame_rate * join_gap_ms / 1000)
+        gap = b"\x00" * (gap_frames * params.nchannels * params.sampwidth)
+
+        position = 0  # Frames written so far
+        for index, (start_frame, end_frame) in enumerate(spans):
+            if index:
+                output.writeframesraw(gap)
+                position += gap_frames
+            offset_map.append([position / frame_rate, start_frame / frame_rate, (end_frame - start_frame) / frame_rate])
+            source.setpos(start_frame)
+            remaining = end_frame - start_frame
+            while remaining > 0:
+                block = min(remaining, STREAM_BLOCK_FRAMES)
+                output.writeframesraw(source.readframes(block))
+                remaining -= block
+            position += end_frame - start_frame
+
+    kept_frames = sum(end_frame - start_frame for start_frame, end_frame in spans)
+    removed_fraction = 1 - kept_frames / params.nframes if params.nframes else 0.0
+    logging.info(
+        f"Trimmed {audio_path} to {len(spans)} speech spans; removed {removed_fraction:.1%} of the audio"
+    )
+    return output_audio_path, offset_map, removed_fraction
+
+def map_to_original_time(seconds, offset_map, is_end=False):
+    """
+    Maps a time in trimmed audio back to the original. A start time inside an
+    inserted gap moves to the next span's start and an end time to the previous
+    span's end; is_end also keeps an end exactly on a boundary in the earlier span.
+    """
+    index = 0
+    for candidate, (trimmed_start, _, _) in enumerate(offset_map):
+        if trimmed_start < seconds or (trimmed_start == seconds and not is_end):
+            index = candidate
+        else:
+            break
+    trimmed_start, original_start, duration = offset_map[index]
+    offset = seconds - trimmed_start
+    if offset > duration and not is_end and index + 1 < len(offset_map):
+        return offset_map[index + 1][1]
+    return original_start + min(max(offset, 0.0), duration)
+
+def read_wav_pcm(wav_bytes, expected_sample_rate):
+    """Strips the header from in-memory mono 16-bit WAV bytes and returns the raw PCM."""
+    with wave.open(io.BytesIO(wav_bytes), 'rb') as wav_file:
+        if (wav_file.getnchannels(), wav_file.getsampwidth(), wav_file.getframerate()) != (1, 2, expected_sample_rate):
+            raise ValueError(
+                f"Expected mono 16-bit audio at {expected_sample_rate} Hz, got {wav_file.getnchannels()} channel(s), "
+                f"{wav_file.getsampwidth() * 8}-bit at {wav_file.getframerate()} Hz"
+            )
+        return wav_file.readframes(wav_file.getnframes())
+
+def assemble_segment_track(segments, segment_pcm, output_audio_path, total_duration, sample_rate):
+    """
+    Writes each segment's mono 16-bit PCM at its "start" time into one
+    preallocated buffer of total_duration seconds and saves it as a WAV.
+    Overlapping lines are mixed rather than cut off; anything past the end is dropped.
+    """
+    with span("assemble_track", "stage", items=len(segments)) as assemble_span:
+        total_frames = int(round(total_duration * sample_rate))
+        track = np.zeros(total_frames, dtype=np.int32)  # Headroom for mixing before clipping
+
+        for segment, pcm in zip(segments, segment_pcm):
+            if not pcm:
+                continue
+            start_frame = int(segment["start"] * sample_rate)
+            if start_frame >= total_frames:
+                logging.warning(f"Segment at {segment['start']:.2f}s starts after the end of the track; skipped")
+                continue
+            samples = np.frombuffer(pcm, dtype='<i2')[:total_frames - start_frame]
+            track[start_frame:start_frame + len(samples)] += samples
+            assemble_span.add(bytes_in=len(pcm))
+
+        write_wav_pcm(output_audio_path, np.clip(track, -32768, 32767).astype('<i2').tobytes(), sample_rate)
+        assemble_span.add(bytes_out=total_frames * 2)
+    logging.info(f"Assembled {len(segments)} segments into {output_audio_path}")
+
+def write_wav_pcm(output_audio_path, pcm, sample_rate):
+    """Writes raw mono 16-bit PCM to a WAV file."""
+    with wave.open(output_audio_path, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm)
+
+# Sentence ends in English or Japanese text, or line breaks
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?。！？])\s+|(?<=[。！？])|\n+')
+# Japanese/Chinese characters and full-width punctuation, which aren't spaced apart
+CJK_CHARACTER = re.compile(r'[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]')
+
+def _split_long_sentence(sentence, max_bytes):
+    """
+    Splits a sentence over max_bytes at the last space that fits, or mid-word if
+    there is none. Returns (separator, part) pairs, separator being what joins
+    the part back onto the one before it (" " for a space cut, "" mid-word).
+    """
+    parts = []
+    current = ""
+    separator = ""
+    for char in sentence:
+        if len((current + char).encode('utf-8')) > max_bytes:
+            split_at = current.rfind(' ')
+            if split_at > 0:
+                parts.append((separator, current[:split_at]))
+                current = current[split_at + 1:]
+                separator = " "
+            else:
+                parts.append((separator, current))
+                current = ""
+                separator = ""
+        current += char
+    if current.strip():
+        parts.append((separator, current))
+    return parts
+
+def _sentence_separator(previous, following):
+    """No space between sentences where either side is CJK text, one space otherwise."""
+    if CJK_CHARACTER.match(previous[-1]) or CJK_CHARACTER.match(following[0]):
+        return ""
+    return " "
+
+def split_text_into_shards(text, max_bytes):
+    """
+    Splits text at sentence boundaries and packs whole sentences into shards of
+    at most max_bytes UTF-8 bytes, in order. Sentences in a shard are joined
+    with a space, except in CJK text, which gets none.
+    """
+    pieces = []  # (separator, piece)
+    previous = None
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        sentence = sentence.strip()
+        if sentence:
+            parts = _split_long_sentence(sentence, max_bytes)
+            if previous is not None:
+                parts[0] = (_sentence_separator(previous, sentence), parts[0][1])
+            pieces.extend(parts)
+            previous = sentence
+
+    shards = []
+    current = ""
+    for separator, piece in pieces:
+        candidate = f"{current}{separator}{piece}" if current else piece
+        if len(candidate.encode('utf-8')) <= max_bytes:
+            current = candidate
+        else:
+            shards.append(current)
+            current = piece
+    if current:
+        shards.append(current)
+    return shards
+
+def synthesize_in_shards(text, synthesize_shard, max_shard_bytes, max_workers, on_shard_done=None):
+    """
+    Splits text into sentence-aligned shards, calls synthesize_shard(shard) -> PCM bytes
+    for up to max_workers shards at once, and returns the PCM concatenated in text order.
+    on_shard_done(completed, total) is called from this thread as shards finish.
+    """
+    shards = split_text_into_shards(text, max_shard_bytes)
+    shard_pcm = [b""] * len(shards)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(synthesize_shard, shard): index for index, shard in enumerate(shards)}
+        for completed, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            try:
+                shard_pcm[index] = future.result()
+            except Exception as e:
+                logging.error(f"Error synthesizing shard {index} of {len(shards)}: {e}")
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise RuntimeError(f"Speech synthesis failed for shard {index}: {e}") from e
+            if on_shard_done:
+                on_shard_done(completed, len(shards))
+
+    logging.info(f"Synthesized {len(shards)} shards ({sum(len(pcm) for pcm in shard_pcm)} bytes of PCM)")
+    return b"".join(shard_pcm)
+
 def extract_audio(video_path):
+    from moviepy.editor import VideoFileClip  # Imported here; moviepy is slow to load and only this fallback needs it
     try:
         logging.info(f"Extracting audio from video: {video_path}")
         audio_output_path = os.path.splitext(video_path)[0] + '_extracted_audio.wav'
@@ -49,14 +376,127 @@ def extract_audio(video_path):
         logging.error(f"Failed to extract audio: {e}")
         raise e
 
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+# Speech recognition gains nothing above 16 kHz; mono 16-bit PCM at this rate is
+# about 5x smaller than the 44.1 kHz stereo track moviepy writes
+RECOGNITION_SAMPLE_RATE = 16000
+
+def extract_audio_for_recognition(video_path, output_audio_path=None, sample_rate=RECOGNITION_SAMPLE_RATE):
+    """
+    Demuxes, downmixes and resamples the video's audio in a single ffmpeg pass,
+    writing mono 16-bit PCM WAV ready for chunking and LINEAR16 recognition.
+    Replaces the extract_audio + convert_to_mono pair, which decode the track twice.
+    """
+    if output_audio_path is None:
+        output_audio_path = os.path.splitext(video_path)[0] + '_extracted_audio_mono.wav'
+
+    command = [
+        FFMPEG_BINARY,
+        '-y',  # Overwrite output file if it exists
+        '-v', 'error',
+        '-i', video_path,
+        '-vn',  # Skip the video stream entirely
+        '-map', '0:a:0',  # First audio track
+        '-ac', '1',  # Downmix to mono
+        '-ar', str(sample_rate),  # Resample
+        '-c:a', 'pcm_s16le',  # LINEAR16
+        output_audio_path
+    ]
+    try:
+        logging.info(f"Extracting recognition audio from video: {video_path}")
+        with span("ffmpeg_extract", "stage", bytes_in=os.path.getsize(video_path)) as extract_span:
+            subprocess.run(command, check=True, capture_output=True)
+            extract_span.add(bytes_out=os.path.getsize(output_audio_path))
+        logging.info(f"Audio extracted to {output_audio_path} ({os.path.getsize(output_audio_path)} bytes, {sample_rate} Hz mono)")
+        return output_audio_path
+    except subprocess.CalledProcessError as e:
+        logging.error(f"Failed to extract audio: {e.stderr.decode(errors='replace')}")
+        raise e
+
+def read_pcm_blocks(audio_path, start_frame, end_frame, block_frames):
+    """Yields the raw PCM of frames start_frame..end_frame of a WAV file, block_frames at a time."""
+    with wave.open(audio_path, 'rb') as wav_file:
+        wav_file.setpos(start_frame)
+        remaining = end_frame - start_frame
+        while remaining > 0:
+            block = min(remaining, block_frames)
+            yield wav_file.readframes(block)
+            remaining -= block
+
+def stream_pcm_from_video(video_path, sample_rate=RECOGNITION_SAMPLE_RATE, block_bytes=3200):
+    """
+    Yields mono 16-bit PCM blocks of the video's audio straight from an ffmpeg pipe,
+    as ffmpeg decodes them, so recognition can start before extraction finishes.
+    """
+    command = [
+        FFMPEG_BINARY, '-v', 'error', '-i', video_path, '-vn', '-map', '0:a:0',
+        '-ac', '1', '-ar', str(sample_rate), '-f', 's16le', '-'  # Raw LINEAR16 to stdout
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        while True:
+            block = process.stdout.read(block_bytes)
+            if not block:
+                break
+            yield block
+    finally:
+        process.stdout.close()
+        returncode = process.wait()
+        stderr = process.stderr.read().decode(errors='replace')
+        process.stderr.close()
+    if returncode != 0:
+        logging.error(f"Failed to stream audio from {video_path}: {stderr}")
+        raise subprocess.CalledProcessError(returncode, command, stderr=stderr)
+
 def convert_to_mono(input_audio_path, output_audio_path):
     """Converts stereo audio to mono."""
+    from pydub import AudioSegment
     sound = AudioSegment.from_wav(input_audio_path)
     mono_sound = sound.set_channels(1)
     mono_sound.export(output_audio_path, format="wav")
     logging.info(f"Converted {input_audio_path} to mono and saved as {output_audio_path}")
 
-def merge_audio_video(original_video_path, synthesized_audio_path, output_video_path, update_progress=None):
+def merge_audio_video(original_video_path, synthesized_audio_path, output_video_path, update_progress=None,
+                      stream_copy=True):
+    """
+    Replaces the video's audio track with the synthesized audio.
+    With stream_copy the original video bitstream is copied untouched and only the
+    new audio is encoded; short audio is padded with silence (apad) and long audio
+    cut at the video's end (-shortest) inside the same ffmpeg graph.
+    stream_copy=False falls back to the moviepy re-encode.
+    """
+    if stream_copy:
+        command = [
+            FFMPEG_BINARY,
+            '-y',  # Overwrite output file if it exists
+            '-v', 'error',
+            '-i', original_video_path,
+            '-i', synthesized_audio_path,
+            '-map', '0:v:0',  # Video from the original
+            '-map', '1:a:0',  # Audio from the synthesized track
+            '-c:v', 'copy',  # No video re-encode
+            '-c:a', 'aac',
+            '-af', 'apad',  # Pad short audio with silence...
+            '-shortest',  # ...and stop at the end of the video
+            output_video_path
+        ]
+        try:
+            logging.info(f"Merging with stream copy: {' '.join(command)}")
+            with span("ffmpeg_merge", "stage",
+                      bytes_in=os.path.getsize(original_video_path) + os.path.getsize(synthesized_audio_path)) as merge_span:
+                subprocess.run(command, check=True, capture_output=True)
+                merge_span.add(bytes_out=os.path.getsize(output_video_path))
+            logging.info(f"Final video saved to {output_video_path}")
+
+            if update_progress:
+                update_progress['value'] = 100
+            return
+        except subprocess.CalledProcessError as e:
+            logging.error(f"Error during merging: {e.stderr.decode(errors='replace')}")
+            raise e
+
+    from moviepy.editor import VideoFileClip, AudioFileClip
+    from pydub import AudioSegment
     try:
         logging.info("Starting audio and video merging...")
         video = VideoFileClip(original_video_path)
@@ -0,0 +1,115 @@
+"""
+Headless batch conversion: runs the same pipeline as the GUI's Start Conversion
+over every video in the given directories/globs, without importing Tk.
+
+    python batch_convert.py D:/Anime/season1 "D:/Anime/extras/*.mkv" --output-dir D:/Anime/output
+
+Progress is printed to stdout as one JSON object per line. The exit code is 0 when
+every episode converted, 1 when any failed and 2 when no input videos were found.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import logging
+import argparse
+import threading
+
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.avi')
+
+def find_videos(inputs):
+    """Expands directories and glob patterns into a sorted, de-duplicated list of video files."""
+    videos = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = [os.path.join(item, name) for name in os.listdir(item)]
+        elif glob.has_magic(item):
+            matches = glob.glob(item)
+        else:
+            matches = [item]
+        videos.extend(path for path in matches if os.path.isfile(path) and path.lower().endswith(VIDEO_EXTENSIONS))
+    return sorted(set(videos))
+
+_emit_lock = threading.Lock()
+
+def emit(event):
+    # Episodes report from several threads; keep each JSON line intact
+    with _emit_lock:
+        print(json.dumps(event), flush=True)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Convert Japanese anime episodes to English audio without the GUI.")
+    parser.add_argument("inputs", nargs="+", help="Video files, directories or glob patterns")
+    parser.add_argument("--output-dir", required=True, help="Directory for converted videos and intermediate audio")
+    parser.add_argument("--suffix", default="_en", help="Appended to each input name for the output file (default: _en)")
+    parser.add_argument("--episodes", type=int, default=None,
+                        help="Episodes converted at the same time (default: 3)")
+    parser.add_argument("--cpu-workers", type=int, default=None,
+                        help="Threads for extract/merge stages (default: CPU count)")
+    parser.add_argument("--cloud-slots", type=int, default=None,
+                        help="Episodes allowed in transcribe/translate/TTS stages at once (default: 2)")
+    parser.add_argument("--state-db", default=None,
+                        help="SQLite file for resumable job state (default: ANIME_STATE_DB or D:/Anime/state.sqlite3)")
+    parser.add_argument("--log-file", default=None, help="Write the detailed log here instead of stderr")
+    parser.add_argument("--trace-dir", default=os.getenv("ANIME_TRACE_DIR"),
+                        help="Record per-stage and per-request timings and write a summary and Chrome trace here")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Configure logging before the backends import, so their file-based defaults don't apply
+    logging.basicConfig(
+        filename=args.log_file,
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    import anime_converter_scheduler
+    from anime_converter_state import JobStateStore, get_state_store
+    import anime_converter_tracing
+    from anime_converter_clients import get_client_registry
+
+    if args.trace_dir:
+        anime_converter_tracing.enable_tracing()
+
+    videos = find_videos(args.inputs)
+    if not videos:
+        emit({"event": "error", "message": "No input videos found"})
+        return 2
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    jobs = [
+        (video_path,
+         os.path.join(args.output_dir, f"{os.path.splitext(os.path.basename(video_path))[0]}{args.suffix}.mp4"),
+         args.output_dir)
+        for video_path in videos
+    ]
+
+    def report(video_path, event):
+        emit(dict(event, event="stage", video=video_path))
+
+    scheduler_options = {
+        "max_episodes": args.episodes,
+        "cpu_workers": args.cpu_workers,
+        "cloud_slots": args.cloud_slots,
+    }
+    batch_started_at = time.time()
+    state_store = JobStateStore(args.state_db) if args.state_db else get_state_store()
+    results = anime_converter_scheduler.run_episodes(
+        jobs, report=report, state_store=state_store, **{name: value for name, value in scheduler_options.items() if value is not None}
+    )
+
+    if args.trace_dir:
+        summary_path, chrome_path = anime_converter_tracing.export_trace(args.trace_dir, prefix="batch_trace")
+        emit({"event": "trace", "summary": summary_path, "chrome_trace": chrome_path})
+
+    for result in results:
+        emit(dict(result, event="episode"))
+    failures = sum(1 for result in results if result["status"] != "ok")
+    emit(dict(get_client_registry().stats(), event="batch", videos=len(videos), failed=failures,
+              seconds=round(time.time() - batch_started_at, 3)))
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
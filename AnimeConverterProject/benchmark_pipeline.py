@@ -0,0 +1,585 @@
+"""
+Offline micro-benchmarks for the conversion stages. Fixtures are synthetic (tone or
+noise WAVs and a short video with burned-in subtitle bands) and every cloud client
+is a local fake, so this runs on any Linux box without credentials or network.
+
+    python benchmark_pipeline.py                          # every benchmark
+    python benchmark_pipeline.py chunk ocr_loop --audio-seconds 1440
+    python benchmark_pipeline.py --save-baseline          # record benchmark_baseline.json
+    python benchmark_pipeline.py --compare                # exit 1 if anything regressed
+
+Each benchmark runs in a fresh process so its peak RSS is its own. Results are
+printed as one JSON object per line with throughput (audio-seconds/sec, frames/sec
+or segments/sec) and peak RSS. Benchmarks whose dependencies (pydub, OpenCV,
+ffmpeg, the Google client libraries) are missing are reported as skipped.
+"""
+import os
+import sys
+import json
+import time
+import wave
+import shutil
+import subprocess
+import logging
+import argparse
+import importlib
+import resource
+import tempfile
+import tracemalloc
+import multiprocessing
+from datetime import timedelta
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+# Throughput may drop and peak RSS may grow by this fraction before --compare calls it a regression
+DEFAULT_TOLERANCE = 0.2
+
+class BenchmarkSkipped(Exception):
+    pass
+
+def require_modules(*module_names):
+    """
+    Imports each optional dependency a benchmark's run() loads lazily, raising
+    BenchmarkSkipped up front instead of failing mid-timing when one is missing.
+    """
+    for module_name in module_names:
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            raise BenchmarkSkipped(f"{module_name} not available: {e}")
+
+# --- Synthetic fixtures -------------------------------------------------------
+
+def _write_wav(path, seconds, sample_rate, channels, kind):
+    """Writes a 16-bit WAV block by block: a 440 Hz tone with pauses, or white noise."""
+    import numpy as np
+    rng = np.random.default_rng(0)
+    total_frames = int(seconds * sample_rate)
+    with wave.open(path, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        for start in range(0, total_frames, sample_rate):
+            frames = np.arange(start, min(start + sample_rate, total_frames))
+            if kind == "noise":
+                samples = rng.integers(-8000, 8000, len(frames))
+            else:
+                # One second of tone then one of near-silence, so silence snapping has something to find
+                loud = (frames // sample_rate) % 2 == 0
+                samples = np.sin(2 * np.pi * 440 * frames / sample_rate) * np.where(loud, 8000, 20)
+            wav_file.writeframes(np.repeat(samples.astype('<i2')[:, None], channels, axis=1).tobytes())
+
+def audio_fixture(options, channels=1, sample_rate=16000, seconds=None):
+    seconds = seconds or options.audio_seconds
+    path = os.path.join(options.fixture_dir, f"{options.audio_kind}_{seconds}s_{sample_rate}hz_{channels}ch.wav")
+    if not os.path.exists(path):
+        _write_wav(path, seconds, sample_rate, channels, options.audio_kind)
+    return path
+
+def subtitle_frames(width, height, count):
+    """Yields frames of moving gradient with a white subtitle line that changes every 48 frames."""
+    import cv2
+    import numpy as np
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    for index in range(count):
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[:] = ((x + index * 3) % 256).astype(np.uint8)[None, :, None]
+        cv2.putText(frame, f"Subtitle line {index // 48}", (width // 10, int(height * 0.9)),
+                    cv2.FONT_HERSHEY_SIMPLEX, height / 400, (255, 255, 255), max(1, height // 200))
+        yield frame
+
+def video_fixture(options):
+    import cv2
+    width, height = options.video_size
+    path = os.path.join(options.fixture_dir, f"subtitles_{options.video_seconds}s_{width}x{height}.avi")
+    if not os.path.exists(path):
+        fps = 24
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+        for frame in subtitle_frames(width, height, options.video_seconds * fps):
+            writer.write(frame)
+        writer.release()
+    return path
+
+# --- Fake cloud clients -------------------------------------------------------
+
+class FakeBlob:
+    """An object in a FakeBucket; keeps only its size and metadata, not its bytes."""
+
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.size = None
+        self.metadata = None
+
+    def _store(self, size):
+        time.sleep(self.bucket.latency)
+        self.size = size
+        self.bucket.uploaded_bytes += size
+        self.bucket.objects[self.name] = self
+
+    def upload_from_filename(self, filename):
+        self._store(os.path.getsize(filename))
+
+    def upload_from_file(self, file_obj, size):
+        self._store(len(file_obj.read(size)))
+
+    def compose(self, sources):
+        time.sleep(self.bucket.latency)
+        self.size = sum(source.size for source in sources)
+        self.bucket.objects[self.name] = self
+
+    def delete(self):
+        self.bucket.objects.pop(self.name, None)
+
+class FakeBucket:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.objects = {}
+        self.uploaded_bytes = 0
+
+    def blob(self, blob_name):
+        return FakeBlob(self, blob_name)
+
+    def get_blob(self, blob_name):
+        time.sleep(self.latency)
+        return self.objects.get(blob_name)
+
+class FakeStorageClient:
+    """Keeps uploaded objects' sizes and metadata in memory, one FakeBucket per name."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.buckets = {}
+
+    def bucket(self, bucket_name):
+        return self.buckets.setdefault(bucket_name, FakeBucket(self.latency))
+
+class FakeSpeechClient:
+    """Recognizes one utterance per two seconds of the uploaded chunk."""
+
+    def __init__(self, latency=0.0, chunk_seconds=300):
+        self.latency = latency
+        self.chunk_seconds = chunk_seconds
+
+    def long_running_recognize(self, config, audio):
+        time.sleep(self.latency)
+        results = []
+        for start in range(0, self.chunk_seconds, 2):
+            words = [SimpleNamespace(start_time=timedelta(seconds=start), end_time=timedelta(seconds=start + 1.5))]
+            alternative = SimpleNamespace(transcript="これはテストです", words=words)
+            results.append(SimpleNamespace(alternatives=[alternative], result_end_time=timedelta(seconds=start + 1.5)))
+        response = SimpleNamespace(results=results)
+        return SimpleNamespace(result=lambda timeout=None: response)
+
+class FakeTranslateClient:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def translate(self, texts, target_language="en"):
+        time.sleep(self.latency)
+        return [{"translatedText": f"translated {len(text)} characters"} for text in texts]
+
+class FakeTTSClient:
+    """Returns 60 ms of a quiet tone per input character as a WAV at the requested rate."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def synthesize_speech(self, input, voice, audio_config, timeout=None):
+        import io
+        import numpy as np
+        time.sleep(self.latency)
+        sample_rate = audio_config.sample_rate_hertz
+        frames = np.arange(int(len(input.text) * 0.06 * sample_rate))
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(sample_rate)
+            wav_file.writeframes((np.sin(frames / 10) * 3000).astype('<i2').tobytes())
+        return SimpleNamespace(audio_content=buffer.getvalue())
+
+class FakeVisionClient:
+    """Returns the same detected line for every image in the batch."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def batch_annotate_images(self, requests):
+        time.sleep(self.latency)
+        responses = [
+            SimpleNamespace(error=SimpleNamespace(message=""),
+                            text_annotations=[SimpleNamespace(description=f"Subtitle {index}")])
+            for index, _ in enumerate(requests)
+        ]
+        return SimpleNamespace(responses=responses)
+
+class _FakeWidget(dict):
+    """Stands in for the progress bar and status label the OCR loop reports to."""
+
+    def __bool__(self):
+        return True
+
+    def config(self, **kwargs):
+        pass
+
+# --- Benchmarks -----------------------------------------------------------------
+# Each setup function prepares its inputs (untimed) and returns (run, amount, unit),
+# optionally followed by a dict of extra metrics; only run() is timed, and
+# throughput is amount / seconds.
+
+def _remove_chunks(audio_path):
+    directory, name = os.path.split(audio_path)
+    for entry in os.listdir(directory):
+        if entry.startswith(f"{name}_chunk_"):
+            os.remove(os.path.join(directory, entry))
+
+def setup_chunk(options, snap_to_silence=False):
+    from anime_converter_utils import split_audio_by_size
+    audio_path = audio_fixture(options)
+    _remove_chunks(audio_path)
+
+    def run():
+        split_audio_by_size(audio_path, snap_to_silence=snap_to_silence)
+        _remove_chunks(audio_path)
+    return run, options.audio_seconds, "audio_seconds"
+
+def setup_chunk_snapped(options):
+    return setup_chunk(options, snap_to_silence=True)
+
+def setup_convert_to_mono(options):
+    from anime_converter_utils import convert_to_mono
+    require_modules("pydub")
+    stereo_path = audio_fixture(options, channels=2, sample_rate=44100)
+    mono_path = os.path.join(options.work_dir, "mono.wav")
+    return lambda: convert_to_mono(stereo_path, mono_path), options.audio_seconds, "audio_seconds"
+
+def count_frame_buffers(run, frame_shape):
+    """
+    Runs run(step) under tracemalloc and returns roughly how many single-channel
+    frame-sized buffers it allocated. run calls step() after each unit of work;
+    every step adds how far traced memory peaked above where the last one left off.
+    """
+    plane_bytes = frame_shape[0] * frame_shape[1]
+    tracemalloc.start()
+    allocated = 0
+
+    def step():
+        nonlocal allocated
+        peak = tracemalloc.get_traced_memory()[1]
+        allocated += max(0, peak - step.current)
+        tracemalloc.reset_peak()
+        step.current = tracemalloc.get_traced_memory()[0]
+    step.current = tracemalloc.get_traced_memory()[0]
+    try:
+        run(step)
+    finally:
+        tracemalloc.stop()
+    return round(allocated / plane_bytes)
+
+def setup_preprocess_frame(options):
+    from ocr_subtitle_extractor import preprocess_frame
+    frames = list(subtitle_frames(*options.video_size, 8))
+
+    def run(step=lambda: None):
+        for index in range(options.frames):
+            preprocess_frame(frames[index % len(frames)])
+            step()
+    allocations = count_frame_buffers(run, frames[0].shape)
+    return run, options.frames, "frames", {"frame_buffers_allocated": allocations}
+
+def setup_preprocess_frames(options):
+    from ocr_subtitle_extractor import preprocess_frames
+    frames = list(subtitle_frames(*options.video_size, 8))
+    buffer = None
+
+    def run(step=lambda: None):
+        nonlocal buffer
+        for start in range(0, options.frames, options.batch):
+            batch = [frames[index % len(frames)] for index in range(start, min(start + options.batch, options.frames))]
+            buffer = preprocess_frames(batch, buffer)
+            step()
+    allocations = count_frame_buffers(run, frames[0].shape)
+    buffer = None  # Timed runs start from an empty buffer too
+    return run, options.frames, "frames", {"frame_buffers_allocated": allocations}
+
+def setup_ocr_loop(options):
+    import ocr_subtitle_extractor
+    require_modules("google.cloud.vision")
+    video_path = video_fixture(options)
+    vision_client = FakeVisionClient(options.latency)
+
+    def run():
+        ocr_subtitle_extractor.extract_subtitles_with_google_vision(
+            video_path, _FakeWidget(), _FakeWidget(), vision_client=vision_client
+        )
+    return run, options.video_seconds * 24, "frames"
+
+def setup_ocr_loop_tesseract(options):
+    import ocr_subtitle_extractor
+    if shutil.which("tesseract") is None:
+        raise BenchmarkSkipped("tesseract not found")
+    require_modules("pytesseract")
+    video_path = video_fixture(options)
+
+    def run():
+        ocr_subtitle_extractor.extract_subtitles(video_path, _FakeWidget(), _FakeWidget(), engine="tesseract")
+    return run, options.video_seconds * 24, "frames"
+
+def setup_merge(options):
+    from anime_converter_utils import merge_audio_video, FFMPEG_BINARY
+    if shutil.which(FFMPEG_BINARY) is None:
+        raise BenchmarkSkipped(f"{FFMPEG_BINARY} not found")
+    video_path = video_fixture(options)
+    audio_path = audio_fixture(options, sample_rate=24000, seconds=options.video_seconds)
+    output_path = os.path.join(options.work_dir, "merged.mp4")
+    return lambda: merge_audio_video(video_path, audio_path, output_path), options.video_seconds, "audio_seconds"
+
+def setup_transcribe(options):
+    import anime_converter_backend2
+    require_modules("google.cloud.speech_v1p1beta1")
+    audio_path = audio_fixture(options)
+    speech_client = FakeSpeechClient(options.latency)
+
+    def run():
+        # An empty bucket every run, so no chunk upload is skipped as already there
+        anime_converter_backend2.transcribe_audio_segments(
+            audio_path, speech_client=speech_client, storage_client=FakeStorageClient(options.latency), cache=False
+        )
+        _remove_chunks(audio_path)
+    return run, options.audio_seconds, "audio_seconds"
+
+def setup_upload(options):
+    import anime_converter_backend2
+    from anime_converter_utils import split_audio_by_size
+    audio_path = audio_fixture(options)
+    chunks = split_audio_by_size(audio_path)
+
+    def upload_all(storage_client):
+        with ThreadPoolExecutor(max_workers=anime_converter_backend2.TRANSCRIBE_MAX_WORKERS) as executor:
+            list(executor.map(lambda chunk: anime_converter_backend2.upload_to_gcs(
+                "bucket", chunk, storage_client=storage_client), chunks))
+
+    # A second pass over the same chunks should find every object already uploaded
+    storage_client = FakeStorageClient()
+    upload_all(storage_client)
+    first_pass_bytes = storage_client.bucket("bucket").uploaded_bytes
+    upload_all(storage_client)
+    reupload_bytes = storage_client.bucket("bucket").uploaded_bytes - first_pass_bytes
+
+    def run():
+        upload_all(FakeStorageClient(options.latency))
+    return run, options.audio_seconds, "audio_seconds", {"chunks": len(chunks), "reupload_bytes": reupload_bytes}
+
+# Imported only once a stage needs them; importing the GUI must load none of these
+DEFERRED_MODULES = ("moviepy", "pydub", "google.cloud", "grpc", "cv2", "numpy", "openai")
+STARTUP_MODULE = "anime_converter_frontend"
+
+def measure_import_time(module_name):
+    """
+    Imports module_name in a fresh interpreter under -X importtime. Returns the
+    module's cumulative import time in ms, the cumulative ms of each module it
+    imports directly (slowest first) and which DEFERRED_MODULES got loaded.
+    """
+    # Logging is configured first so the module's own basicConfig (a Windows log path) is a no-op
+    code = f"import logging; logging.basicConfig(level=logging.WARNING); import {module_name}"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise BenchmarkSkipped(f"import {module_name} failed: {result.stderr.strip().splitlines()[-1]}")
+
+    # Lines read "import time: self | cumulative | <2 spaces per nesting level>name",
+    # each module listed after everything it imported
+    children_at_level = {}
+    total_ms, breakdown, names = None, {}, []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        level = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        name = name.strip()
+        names.append(name)
+        children = children_at_level.pop(level + 1, [])
+        children_at_level.setdefault(level, []).append((name, int(cumulative) / 1000))
+        if name == module_name:
+            total_ms = int(cumulative) / 1000
+            breakdown = dict(sorted(children, key=lambda child: child[1], reverse=True))
+    loaded = sorted({deferred for deferred in DEFERRED_MODULES for name in names
+                     if name == deferred or name.startswith(f"{deferred}.")})
+    return total_ms, breakdown, loaded
+
+def setup_startup(options):
+    total_ms, breakdown, loaded = measure_import_time(STARTUP_MODULE)
+
+    def run():
+        measure_import_time(STARTUP_MODULE)
+    return run, 1, "startups", {
+        "import_ms": round(total_ms, 1),
+        "slowest_imports_ms": {name: round(ms, 1) for name, ms in list(breakdown.items())[:8]},
+        "deferred_modules_loaded": loaded,
+    }
+
+def _fake_segments(count):
+    return [{"start": index * 2.0, "end": index * 2.0 + 1.5, "text": "これはテストです",
+             "translated_text": "This is a test line."} for index in range(count)]
+
+def setup_translate(options):
+    import anime_converter_backend2
+    segments = _fake_segments(options.segments)
+    translate_client = FakeTranslateClient(options.latency)
+
+    def run():
+        anime_converter_backend2.translate_segments(segments, translate_client=translate_client, cache=False)
+    return run, options.segments, "segments"
+
+def setup_synthesize(options):
+    import anime_converter_backend2
+    require_modules("google.cloud.texttospeech")
+    segments = _fake_segments(options.segments)
+    output_path = os.path.join(options.work_dir, "synthesized.wav")
+    tts_client = FakeTTSClient(options.latency)
+    total_duration = options.segments * 2.0
+
+    def run():
+        anime_converter_backend2.synthesize_segments(
+            segments, output_path, total_duration, tts_client=tts_client, cache=False
+        )
+    return run, total_duration, "audio_seconds"
+
+# Benchmark name -> setup function, in the order they run
+BENCHMARKS = {
+    "startup": setup_startup,
+    "chunk": setup_chunk,
+    "chunk_snapped": setup_chunk_snapped,
+    "convert_to_mono": setup_convert_to_mono,
+    "preprocess_frame": setup_preprocess_frame,
+    "preprocess_frames": setup_preprocess_frames,
+    "ocr_loop": setup_ocr_loop,
+    "ocr_loop_tesseract": setup_ocr_loop_tesseract,
+    "merge": setup_merge,
+    "transcribe": setup_transcribe,
+    "upload": setup_upload,
+    "translate": setup_translate,
+    "synthesize": setup_synthesize,
+}
+
+def _run_benchmark(name, options):
+    """Runs one benchmark in the current (fresh) process and returns its result dict."""
+    # Configure logging before the backends import, so their file-based defaults don't apply
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        run, amount, unit, *extra = BENCHMARKS[name](options)
+    except (ImportError, BenchmarkSkipped) as e:
+        return {"benchmark": name, "status": "skipped", "reason": str(e)}
+
+    timings = []
+    try:
+        for _ in range(options.repeat):
+            started_at = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started_at)
+    except ImportError as e:
+        # A lazily imported dependency that setup didn't probe for
+        return {"benchmark": name, "status": "skipped", "reason": str(e)}
+    best = min(timings)
+    return {
+        "benchmark": name,
+        "status": "ok",
+        "seconds": round(best, 4),
+        "throughput": round(amount / best, 2),
+        "unit": f"{unit}/sec",
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),  # KiB on Linux
+        **(extra[0] if extra else {}),
+    }
+
+def run_benchmark(name, options):
+    """Runs one benchmark in a new process, so peak RSS isn't inherited from earlier ones."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_run_benchmark, name, options).result()
+
+def compare_to_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Returns a list of human-readable regressions of results against baseline."""
+    regressions = []
+    for result in results:
+        if result.get("deferred_modules_loaded"):
+            regressions.append(
+                f"{result['benchmark']}: imports {', '.join(result['deferred_modules_loaded'])} at startup"
+            )
+        reference = baseline.get(result["benchmark"])
+        if result["status"] != "ok" or not reference:
+            continue
+        if result["throughput"] < reference["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{result['benchmark']}: throughput {result['throughput']} {result['unit']} "
+                f"vs baseline {reference['throughput']}"
+            )
+        if result["peak_rss_mb"] > reference["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(
+                f"{result['benchmark']}: peak RSS {result['peak_rss_mb']} MB vs baseline {reference['peak_rss_mb']} MB"
+            )
+    return regressions
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the conversion stages offline with synthetic fixtures.")
+    parser.add_argument("benchmarks", nargs="*",
+                        help=f"Benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--audio-seconds", type=int, default=600, help="Length of the synthetic audio (default: 600)")
+    parser.add_argument("--audio-kind", choices=("tone", "noise"), default="tone")
+    parser.add_argument("--video-seconds", type=int, default=20, help="Length of the synthetic video at 24 fps (default: 20)")
+    parser.add_argument("--video-size", type=int, nargs=2, default=(1920, 1080), metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--frames", type=int, default=240, help="Frames for preprocess_frame (default: 240)")
+    parser.add_argument("--batch", type=int, default=8, help="Frames per preprocess_frames call (default: 8)")
+    parser.add_argument("--segments", type=int, default=600, help="Segments for translate/synthesize (default: 600)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds each fake cloud call sleeps, to model network round trips (default: 0)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the fastest is reported (default: 3)")
+    parser.add_argument("--fixture-dir", default=None,
+                        help="Where synthetic fixtures are generated and reused (default: a temporary directory)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file (default: benchmark_baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="Exit 1 if any benchmark regressed against the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed fractional slowdown / RSS growth for --compare (default: {DEFAULT_TOLERANCE})")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    return args
+
+def main(argv=None):
+    options = parse_args(argv)
+    names = options.benchmarks or list(BENCHMARKS)
+
+    with tempfile.TemporaryDirectory(prefix="anime_bench_") as temp_dir:
+        options.fixture_dir = options.fixture_dir or os.path.join(temp_dir, "fixtures")
+        options.work_dir = os.path.join(temp_dir, "work")
+        os.makedirs(options.fixture_dir, exist_ok=True)
+        os.makedirs(options.work_dir, exist_ok=True)
+
+        results = []
+        for name in names:
+            result = run_benchmark(name, options)
+            print(json.dumps(result), flush=True)
+            results.append(result)
+
+    baseline = {}
+    if os.path.exists(options.baseline):
+        with open(options.baseline) as f:
+            baseline = json.load(f)
+
+    if options.save_baseline:
+        baseline.update({result["benchmark"]: result for result in results if result["status"] == "ok"})
+        with open(options.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(json.dumps({"event": "baseline_saved", "path": options.baseline}), flush=True)
+        return 0
+
+    if options.compare:
+        regressions = compare_to_baseline(results, baseline, options.tolerance)
+        print(json.dumps({"event": "comparison", "baseline": options.baseline, "regressions": regressions}), flush=True)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
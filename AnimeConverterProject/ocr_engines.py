@@ -0,0 +1,126 @@
+import os
+import logging
+import cv2
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from anime_converter_tracing import span
+from anime_converter_clients import get_client
+
+# Engine used when a job doesn't choose one
+DEFAULT_OCR_ENGINE = os.getenv("ANIME_OCR_ENGINE", "vision")
+
+# Vision accepts at most 16 images per batch_annotate_images request
+OCR_BATCH_SIZE = 16
+# Raw JPEG bytes per batch; leaves headroom under Vision's 10 MB request limit
+OCR_BATCH_MAX_BYTES = 7 * 1024 * 1024
+OCR_MAX_INFLIGHT_BATCHES = 4
+
+TESSERACT_LANGUAGE = "jpn"
+TESSERACT_CONFIG = "--oem 3 --psm 6"  # Same settings setup_ocr_integration.py used
+# Subtitle crops handed to a worker process at a time, to amortize the hand-off
+TESSERACT_BATCH_SIZE = 8
+TESSERACT_BATCH_MAX_BYTES = 16 * 1024 * 1024
+TESSERACT_WORKERS = os.cpu_count() or 1
+
+def _annotate_batch(vision_client, batch):
+    """
+    Sends a list of (frame_index, jpeg_bytes) to Vision in one request and
+    returns (frame_index, detected_text) pairs in the same order.
+    """
+    from google.cloud import vision
+    requests = [
+        vision.AnnotateImageRequest(
+            image=vision.Image(content=content),
+            features=[vision.Feature(type_=vision.Feature.Type.TEXT_DETECTION)]
+        )
+        for _, content in batch
+    ]
+    with span("vision_batch", "api", items=len(batch), bytes_out=sum(len(content) for _, content in batch)):
+        response = vision_client.batch_annotate_images(requests=requests)
+
+    results = []
+    for (frame_index, _), image_response in zip(batch, response.responses):
+        if image_response.error.message:
+            logging.error(f"Vision error for frame {frame_index}: {image_response.error.message}")
+        texts = image_response.text_annotations
+        results.append((frame_index, texts[0].description.strip() if texts else ""))
+    return results
+
+def _tesseract_batch(batch, language, config):
+    """
+    Runs in a worker process: OCRs a list of (frame_index, png_bytes) subtitle
+    crops and returns (frame_index, detected_text) pairs in the same order.
+    """
+    import pytesseract
+    results = []
+    for frame_index, content in batch:
+        image = cv2.imdecode(np.frombuffer(content, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        # Thresholded subtitles come out light on dark; Tesseract reads dark text on light best
+        text = pytesseract.image_to_string(cv2.bitwise_not(image), lang=language, config=config)
+        results.append((frame_index, text.strip()))
+    return results
+
+class VisionOCREngine:
+    """
+    Google Cloud Vision TEXT_DETECTION on whole preprocessed frames, up to
+    max_inflight_batches batch requests at a time. Best on difficult episodes.
+    """
+    name = "vision"
+    unit_kind = "ocr_batch"  # Job units recorded for finished batches
+    crop_to_subtitle_band = False
+    image_format = '.jpg'
+
+    def __init__(self, vision_client=None, batch_size=OCR_BATCH_SIZE, batch_max_bytes=OCR_BATCH_MAX_BYTES,
+                 max_inflight_batches=OCR_MAX_INFLIGHT_BATCHES):
+        self.vision_client = vision_client or get_client("vision")
+        self.batch_size = batch_size
+        self.batch_max_bytes = batch_max_bytes
+        self.max_inflight_batches = max_inflight_batches
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_inflight_batches))
+
+    def submit(self, batch):
+        """Starts OCR of [(frame_index, image_bytes)]; the future yields [(frame_index, text)]."""
+        return self._executor.submit(_annotate_batch, self.vision_client, batch)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+class TesseractOCREngine:
+    """
+    Local Tesseract OCR in a process pool sized to the core count, fed only the
+    subtitle band of each frame. Needs no network, so bulk runs scale with cores.
+    """
+    name = "tesseract"
+    unit_kind = "ocr_batch_tesseract"
+    crop_to_subtitle_band = True
+    image_format = '.png'  # Lossless, and small for thresholded crops
+
+    def __init__(self, workers=TESSERACT_WORKERS, batch_size=TESSERACT_BATCH_SIZE,
+                 batch_max_bytes=TESSERACT_BATCH_MAX_BYTES, language=TESSERACT_LANGUAGE, config=TESSERACT_CONFIG):
+        self.batch_size = batch_size
+        self.batch_max_bytes = batch_max_bytes
+        # Twice the pool, so every worker has its next batch queued while results are collected
+        self.max_inflight_batches = 2 * max(1, workers)
+        self.language = language
+        self.config = config
+        self._executor = ProcessPoolExecutor(max_workers=max(1, workers))
+
+    def submit(self, batch):
+        return self._executor.submit(_tesseract_batch, batch, self.language, self.config)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+# Engine name -> class; a job picks one by name
+OCR_ENGINES = {
+    VisionOCREngine.name: VisionOCREngine,
+    TesseractOCREngine.name: TesseractOCREngine,
+}
+
+def create_ocr_engine(name=None, **options):
+    """Creates the named engine (DEFAULT_OCR_ENGINE if None), passing options to its constructor."""
+    name = name or DEFAULT_OCR_ENGINE
+    if name not in OCR_ENGINES:
+        raise ValueError(f"Unknown OCR engine {name!r}; choose from {', '.join(OCR_ENGINES)}")
+    logging.info(f"Using OCR engine: {name}")
+    return OCR_ENGINES[name](**options)
@@ -2,12 +2,21 @@ import os
 import cv2
 import numpy as np
 import logging
-import openai
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from google.cloud import vision, texttospeech
+import queue
 import threading
 import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from anime_converter_state import get_state_store
+from anime_converter_tracing import span
+from anime_converter_clients import get_client
+from anime_converter_progress import ProgressChannel
+from anime_converter_subtitles import SubtitleEventMerger, SUBTITLE_MERGE_SIMILARITY, write_srt, write_ass
+from ocr_engines import (create_ocr_engine, VisionOCREngine, DEFAULT_OCR_ENGINE, OCR_ENGINES, OCR_BATCH_SIZE,
+                         OCR_BATCH_MAX_BYTES, OCR_MAX_INFLIGHT_BATCHES, TESSERACT_BATCH_SIZE)
+from anime_converter_utils import read_wav_pcm, write_wav_pcm, synthesize_in_shards
 
 # Setup logging
 logging.basicConfig(
@@ -20,9 +29,6 @@ logging.basicConfig(
 if "GOOGLE_APPLICATION_CREDENTIALS" not in os.environ:
     os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "D:/Anime/credentials.json"
 
-# Set up OpenAI API key
-openai.api_key = os.getenv("OPENAI_API_KEY")
-
 def preprocess_frame(frame):
     """
     Preprocess the frame to filter out noise and improve OCR accuracy.
@@ -35,10 +41,184 @@ def preprocess_frame(frame):
     _, thresholded_frame = cv2.threshold(enhanced_frame, 128, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
     return thresholded_frame
 
-def extract_subtitles_with_google_vision(video_path, progress_bar, status_label):
-    # Initialize the Google Vision client
-    vision_client = vision.ImageAnnotatorClient()
+def preprocess_frames(frames, out=None):
+    """
+    Batch version of preprocess_frame for a stack of same-sized BGR frames (or
+    subtitle bands). Every step writes into out, a (count, height, width) uint8
+    buffer that is reused when it fits, so repeated calls allocate nothing.
+    Returns out[:count]; each plane equals preprocess_frame on the same frame.
+    """
+    count = len(frames)
+    height, width = frames[0].shape[:2]
+    if out is None or out.shape[0] < count or out.shape[1:] != (height, width):
+        out = np.empty((count, height, width), dtype=np.uint8)
+    for frame, plane in zip(frames, out):
+        # Grayscale, equalize and threshold in place, each step reading the previous one's result
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=plane)
+        cv2.equalizeHist(plane, dst=plane)
+        cv2.threshold(plane, 128, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=plane)
+    return out[:count]
+
+# Subtitles are burned into the bottom of the frame; only this band is used to
+# decide whether a frame is worth sending to OCR
+SUBTITLE_BAND_TOP = 0.75  # Fraction of frame height where the band starts
+SIGNATURE_SIZE = (64, 16)  # (width, height) the band is shrunk to before comparing
+# Mean absolute difference (0-255) from the last OCR'd band that triggers a new OCR call
+OCR_CHANGE_THRESHOLD = 6.0
+
+def subtitle_band_signature(frame):
+    """
+    Returns a small grayscale thumbnail of the subtitle band. Comparing
+    thumbnails is far cheaper than OCR and ignores compression noise.
+    """
+    band = frame[int(frame.shape[0] * SUBTITLE_BAND_TOP):]
+    gray_band = cv2.cvtColor(band, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray_band, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+def subtitle_band_changed(signature, previous_signature, threshold=OCR_CHANGE_THRESHOLD):
+    """Returns True if the band moved past threshold since the last OCR'd frame."""
+    if previous_signature is None:
+        return True
+    return float(np.mean(np.abs(signature - previous_signature))) > threshold
 
+def _submit_batch(engine, batch, units):
+    """
+    Submits a batch to the OCR engine, or returns its recorded results if an earlier
+    run of this job already finished it. Finished batches are recorded in units (a JobUnits).
+    """
+    batch_key = batch[0][0]  # First frame index identifies the batch
+    recorded = units.get(engine.unit_kind, batch_key) if units else None
+    if recorded is not None:
+        future = Future()
+        future.set_result([tuple(result) for result in recorded])
+        return future
+
+    future = engine.submit(batch)
+    if units:
+        def record(done):
+            if done.exception() is None:
+                units.put(engine.unit_kind, batch_key, done.result())
+        future.add_done_callback(record)
+    return future
+
+def _add_readings(results, merger):
+    """Feeds a batch's (frame_index, detected_text) results to the event merger in frame order."""
+    for frame_index, detected_text in results:
+        logging.debug(f"Frame {frame_index}: {detected_text}")
+        merger.add(frame_index, detected_text)
+
+# Decoded frames waiting for preprocessing; bounds memory to this many full frames
+OCR_DECODE_QUEUE_DEPTH = 16
+# Threads preprocessing and JPEG-encoding frames (OpenCV releases the GIL)
+OCR_PREPROCESS_WORKERS = min(4, os.cpu_count() or 1)
+# Frames being preprocessed at once, awaited in frame order
+OCR_MAX_INFLIGHT_FRAMES = 2 * OCR_PREPROCESS_WORKERS
+
+_END_OF_VIDEO = object()
+# Each preprocessing thread keeps its own preprocess_frames buffer
+_preprocess_buffers = threading.local()
+
+def _decode_frames(video_capture, frame_queue, stop_event, change_threshold):
+    """
+    Decoder thread: reads every frame and queues (frame_index, frame) for frames whose
+    subtitle band changed, (frame_index, None) for the rest, then _END_OF_VIDEO (or
+    the exception that stopped decoding). The queue's depth blocks decoding when
+    preprocessing falls behind; stop_event ends decoding early.
+    """
+    def put(item):
+        while not stop_event.is_set():
+            try:
+                frame_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        frame_index = 0
+        previous_signature = None
+        while not stop_event.is_set():
+            with span("decode", "frame"):
+                ret, frame = video_capture.read()
+            if not ret:
+                break
+
+            # Skip OCR entirely while the subtitle band looks the same as last time
+            signature = subtitle_band_signature(frame)
+            if subtitle_band_changed(signature, previous_signature, change_threshold):
+                previous_signature = signature
+            else:
+                frame = None
+            if not put((frame_index, frame)):
+                return
+            frame_index += 1
+        put(_END_OF_VIDEO)
+    except Exception as e:
+        logging.error(f"Error decoding frame: {e}")
+        put(e)
+
+def _prepare_frame(frame_index, frame, engine):
+    """
+    Preprocesses one frame (just its subtitle band if the engine asks for crops) and
+    encodes it in the engine's image format; returns (frame_index, bytes or None).
+    """
+    if engine.crop_to_subtitle_band:
+        frame = frame[int(frame.shape[0] * SUBTITLE_BAND_TOP):]
+    with span("preprocess", "frame"):
+        # The buffer is reused by this thread's next frame, after imencode has consumed it
+        _preprocess_buffers.out = preprocess_frames([frame], getattr(_preprocess_buffers, "out", None))
+        processed_frame = _preprocess_buffers.out[0]
+
+    # Convert the frame to bytes for the OCR engine
+    with span("encode", "frame") as encode_span:
+        success, encoded_image = cv2.imencode(engine.image_format, processed_frame)
+        if not success:
+            logging.error(f"Error encoding frame {frame_index}.")
+            return frame_index, None
+        encode_span.add(bytes_out=len(encoded_image))
+    return frame_index, encoded_image.tobytes()
+
+def extract_subtitles(video_path, progress_bar, status_label, engine=None, change_threshold=OCR_CHANGE_THRESHOLD,
+                      stats=None, units=None, decode_queue_depth=OCR_DECODE_QUEUE_DEPTH,
+                      preprocess_workers=OCR_PREPROCESS_WORKERS, max_inflight_frames=OCR_MAX_INFLIGHT_FRAMES,
+                      events=None, merge_similarity=SUBTITLE_MERGE_SIMILARITY):
+    """
+    Runs OCR as three overlapping stages: a decoder thread feeding a bounded queue,
+    a pool preprocessing and encoding the frames whose subtitle band changed, and
+    the OCR engine's batches. Memory stays bounded by the queue depths, and OCR
+    time approaches the slower of decoding and OCR rather than their sum.
+    engine is an engine name from ocr_engines.OCR_ENGINES (DEFAULT_OCR_ENGINE if
+    None), or an engine object, which the caller then owns and closes.
+    Consecutive readings at least merge_similarity alike become one subtitle event;
+    returns each event's text, and appends the timed events ({"start", "end", "text",
+    "readings"} in seconds) to events if a list is given.
+    """
+    owns_engine = engine is None or isinstance(engine, str)
+    if owns_engine:
+        engine = create_ocr_engine(engine)
+    try:
+        return _extract_subtitles(video_path, progress_bar, status_label, engine, change_threshold, stats, units,
+                                  decode_queue_depth, preprocess_workers, max_inflight_frames, events,
+                                  merge_similarity)
+    finally:
+        if owns_engine:
+            engine.close()
+
+def extract_subtitles_with_google_vision(video_path, progress_bar, status_label,
+                                         change_threshold=OCR_CHANGE_THRESHOLD, stats=None,
+                                         batch_size=OCR_BATCH_SIZE, batch_max_bytes=OCR_BATCH_MAX_BYTES,
+                                         max_inflight_batches=OCR_MAX_INFLIGHT_BATCHES, vision_client=None,
+                                         units=None, **kwargs):
+    """extract_subtitles with the Google Vision engine."""
+    engine = VisionOCREngine(vision_client, batch_size, batch_max_bytes, max_inflight_batches)
+    try:
+        return extract_subtitles(video_path, progress_bar, status_label, engine, change_threshold, stats, units,
+                                 **kwargs)
+    finally:
+        engine.close()
+
+def _extract_subtitles(video_path, progress_bar, status_label, engine, change_threshold, stats, units,
+                       decode_queue_depth, preprocess_workers, max_inflight_frames, events, merge_similarity):
     # Open the video file
     video_capture = cv2.VideoCapture(video_path)
 
@@ -46,49 +226,107 @@ def extract_subtitles_with_google_vision(video_path, progress_bar, status_label)
         logging.error("Error: Could not open video.")
         return []
 
-    subtitles = []
+    merger = SubtitleEventMerger(video_capture.get(cv2.CAP_PROP_FPS), merge_similarity)
     frame_count = 0
-    previous_text = ""
-
-    total_frames = int(video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
-
-    while True:
-        ret, frame = video_capture.read()
-        if not ret:
-            break
-
-        # Preprocess the frame
-        processed_frame = preprocess_frame(frame)
-
-        # Convert the frame to bytes for Google Vision API
-        success, encoded_image = cv2.imencode('.jpg', processed_frame)
-        if not success:
-            logging.error(f"Error encoding frame {frame_count}.")
-            continue
-
-        image = vision.Image(content=encoded_image.tobytes())
+    reported_percent = -1
+    frames_sent = 0
+    frames_skipped = 0
+    batches_sent = 0
 
-        # Perform text detection using Google Vision API
-        response = vision_client.text_detection(image=image)
-        texts = response.text_annotations
+    pending_batch = []  # (frame_index, image_bytes) not yet submitted
+    pending_bytes = 0
+    preparing = deque()  # Frames being preprocessed, oldest first
+    in_flight = deque()  # Submitted batches, oldest first, so results come back in frame order
 
-        if texts:
-            detected_text = texts[0].description.strip()
-            if detected_text and detected_text != previous_text:
-                subtitles.append(detected_text)
-                logging.info(f"Frame {frame_count}: {detected_text}")
-                previous_text = detected_text  # To prevent redundancy
-
-        frame_count += 1
+    total_frames = int(video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
 
-        # Update progress bar
-        progress = (frame_count / total_frames) * 100
-        progress_bar['value'] = progress
-        status_label.config(text=f"Extracting Subtitles: {int(progress)}%")
-        root.update_idletasks()
+    frame_queue = queue.Queue(maxsize=max(1, decode_queue_depth))
+    stop_event = threading.Event()
+    decoder = threading.Thread(
+        target=_decode_frames, args=(video_capture, frame_queue, stop_event, change_threshold), daemon=True
+    )
 
-    video_capture.release()
-    logging.info("Google Vision subtitle extraction completed.")
+    def add_prepared(prepared_future):
+        nonlocal pending_batch, pending_bytes, frames_sent, batches_sent
+        frame_index, content = prepared_future.result()
+        if content is None:
+            return
+        if pending_batch and pending_bytes + len(content) > engine.batch_max_bytes:
+            in_flight.append(_submit_batch(engine, pending_batch, units))
+            pending_batch, pending_bytes = [], 0
+
+        pending_batch.append((frame_index, content))
+        pending_bytes += len(content)
+        frames_sent += 1
+
+        if len(pending_batch) >= engine.batch_size:
+            in_flight.append(_submit_batch(engine, pending_batch, units))
+            pending_batch, pending_bytes = [], 0
+
+        # Bound memory: wait on the oldest batch once the pool is saturated
+        while len(in_flight) > engine.max_inflight_batches:
+            _add_readings(in_flight.popleft().result(), merger)
+            batches_sent += 1
+
+    decoder.start()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, preprocess_workers)) as prepare_executor:
+            while True:
+                item = frame_queue.get()
+                if item is _END_OF_VIDEO:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+
+                frame_index, frame = item
+                if frame is None:
+                    frames_skipped += 1
+                else:
+                    preparing.append(prepare_executor.submit(_prepare_frame, frame_index, frame, engine))
+                    # Batches are built in frame order, so hand over the oldest frame first
+                    while len(preparing) > max_inflight_frames:
+                        add_prepared(preparing.popleft())
+
+                frame_count += 1
+
+                # Publish progress once per whole percent rather than every frame
+                progress = (frame_count / total_frames) * 100
+                if int(progress) != reported_percent:
+                    reported_percent = int(progress)
+                    progress_bar['value'] = progress
+                    status_label.config(text=f"Extracting Subtitles: {reported_percent}%")
+
+            while preparing:
+                add_prepared(preparing.popleft())
+            if pending_batch:
+                in_flight.append(_submit_batch(engine, pending_batch, units))
+            while in_flight:
+                _add_readings(in_flight.popleft().result(), merger)
+                batches_sent += 1
+    finally:
+        stop_event.set()
+        decoder.join()
+        video_capture.release()
+
+    subtitle_events = merger.finish(frame_count)
+    subtitles = [event["text"] for event in subtitle_events]
+    merged_characters = sum(len(text) for text in subtitles)
+    logging.info(
+        f"Subtitle extraction ({engine.name}) completed. Frames sent to OCR: {frames_sent}, "
+        f"skipped: {frames_skipped}, batch requests: {batches_sent}, readings: {merger.readings}, "
+        f"subtitle events: {len(subtitle_events)}, characters: {merged_characters} "
+        f"(exact-match dedup would keep {merger.distinct_characters})"
+    )
+    if events is not None:
+        events.extend(subtitle_events)
+    if stats is not None:
+        stats["frames_sent"] = frames_sent
+        stats["frames_skipped"] = frames_skipped
+        stats["batches_sent"] = batches_sent
+        stats["readings"] = merger.readings
+        stats["events"] = len(subtitle_events)
+        stats["characters"] = merged_characters
+        stats["distinct_characters"] = merger.distinct_characters
     return subtitles
 
 def filter_non_english_text(text):
@@ -102,10 +340,11 @@ def process_with_openai(text, progress_bar, status_label):
     """
     Process the extracted text with OpenAI to create a continuous, coherent subtitle.
     """
+    import openai  # Only this step needs it; loading it at import slowed startup
+    openai.api_key = os.getenv("OPENAI_API_KEY")
     try:
         logging.info("Starting processing of text with OpenAI.")
         status_label.config(text="Processing with OpenAI...")
-        root.update_idletasks()
 
         response = openai.ChatCompletion.create(
             model="gpt-4",
@@ -123,43 +362,54 @@ def process_with_openai(text, progress_bar, status_label):
         logging.info("OpenAI processing completed.")
         progress_bar['value'] = 100
         status_label.config(text="OpenAI Processing Completed")
-        root.update_idletasks()
 
         return combined_text
     except Exception as e:
         logging.error(f"Error processing text with OpenAI: {e}")
         raise e
 
-def synthesize_speech(text, output_audio_path, progress_bar, status_label):
-    try:
-        client = texttospeech.TextToSpeechClient()
-        input_text = texttospeech.SynthesisInput(text=text)
-        voice = texttospeech.VoiceSelectionParams(
+# Sample rate requested from TTS so shards can be joined as raw PCM
+TTS_SAMPLE_RATE = 24000
+# The TTS API rejects inputs over 5000 bytes; smaller shards also synthesize in parallel
+TTS_SHARD_MAX_BYTES = 1500
+TTS_MAX_WORKERS = 8
+
+def _synthesize_shard(client, text):
+    """Synthesizes one shard and returns its PCM without the WAV header."""
+    from google.cloud import texttospeech
+    response = client.synthesize_speech(
+        input=texttospeech.SynthesisInput(text=text),
+        voice=texttospeech.VoiceSelectionParams(
             language_code="en-US",
             ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL
-        )
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.LINEAR16
-        )
+        ),
+        audio_config=texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding.LINEAR16,
+            sample_rate_hertz=TTS_SAMPLE_RATE
+        ),
+        timeout=300  # Increased timeout
+    )
+    return read_wav_pcm(response.audio_content, TTS_SAMPLE_RATE)
+
+def synthesize_speech(text, output_audio_path, progress_bar, status_label,
+                      max_workers=TTS_MAX_WORKERS, max_shard_bytes=TTS_SHARD_MAX_BYTES, tts_client=None):
+    try:
+        client = tts_client or get_client("tts")
 
         logging.info("Starting speech synthesis of processed text.")
         status_label.config(text="Synthesizing Speech...")
-        root.update_idletasks()
 
-        response = client.synthesize_speech(
-            input=input_text,
-            voice=voice,
-            audio_config=audio_config,
-            timeout=300  # Increased timeout
-        )
+        def on_shard_done(completed, total):
+            progress_bar['value'] = int(completed / total * 100)
 
-        with open(output_audio_path, "wb") as out:
-            out.write(response.audio_content)
+        pcm = synthesize_in_shards(
+            text, lambda shard: _synthesize_shard(client, shard), max_shard_bytes, max_workers, on_shard_done
+        )
+        write_wav_pcm(output_audio_path, pcm, TTS_SAMPLE_RATE)
         logging.info(f"Synthesized speech saved to {output_audio_path}")
 
         progress_bar['value'] = 100
         status_label.config(text="Speech Synthesis Completed")
-        root.update_idletasks()
 
     except Exception as e:
         logging.error(f"Error during speech synthesis: {e}")
@@ -189,21 +439,20 @@ def merge_audio_video(video_path, audio_path, output_path):
         logging.info(f"Running command: {' '.join(command)}")
         subprocess.run(command, check=True)
         logging.info(f"Successfully merged audio and video. Output saved to {output_path}")
-        messagebox.showinfo("Merge Complete", f"Video and audio merged successfully. Output saved at: {output_path}")
+        progress_channel.call(messagebox.showinfo, "Merge Complete", f"Video and audio merged successfully. Output saved at: {output_path}")
     except subprocess.CalledProcessError as e:
         logging.error(f"Error merging audio and video: {e}")
-        messagebox.showerror("Error", f"An error occurred while merging audio and video: {e}")
+        progress_channel.call(messagebox.showerror, "Error", f"An error occurred while merging audio and video: {e}")
 
 def start_ocr_thread():
-    threading.Thread(target=run_ocr).start()
-
-def run_ocr():
-    video_path = japanese_file_path.get()
-    output_dir = output_directory.get()
-    output_name = output_filename.get()
+    # Tk variables are read here on the main thread; the worker only publishes progress
+    threading.Thread(target=run_ocr, args=(
+        japanese_file_path.get(), output_directory.get(), output_filename.get(), ocr_engine_name.get()
+    )).start()
 
+def run_ocr(video_path, output_dir, output_name, engine_name):
     if not video_path:
-        messagebox.showerror("Error", "Please select a Japanese video file.")
+        progress_channel.call(messagebox.showerror, "Error", "Please select a Japanese video file.")
         return
 
     if not output_dir:
@@ -218,25 +467,39 @@ def run_ocr():
     output_audio_path = os.path.join(output_dir, output_name + ".wav")
     output_video_path = os.path.join(output_dir, output_name + ".mp4")
 
-    update_progress_bar(progress_bar_ocr, status_label_ocr, "Extracting Subtitles...", 0)
-
-    subtitles = extract_subtitles_with_google_vision(video_path, progress_bar_ocr, status_label_ocr)
+    ocr_progress = progress_channel.reporter("ocr")
+    update_progress_bar(ocr_progress, ocr_progress, "Extracting Subtitles...", 0)
+
+    # Frame batches finished by an earlier, interrupted run of this video are not re-sent
+    state_store = get_state_store()
+    # Batch size decides which frames each recorded batch covers, so it is part of the job
+    batch_size = OCR_BATCH_SIZE if engine_name == "vision" else TESSERACT_BATCH_SIZE
+    ocr_params = {"job": "ocr", "engine": engine_name, "batch_size": batch_size, "change_threshold": OCR_CHANGE_THRESHOLD}
+    job_id = state_store.job_id_for(video_path, ocr_params)
+    state_store.open_job(job_id, video_path, ocr_params)
+    events = []
+    subtitles = extract_subtitles(video_path, ocr_progress, ocr_progress, engine=engine_name,
+                                  units=state_store.units_for(job_id), events=events)
+    state_store.mark_completed(job_id)
     if subtitles:
+        write_srt(events, os.path.join(output_dir, output_name + ".srt"))
+        write_ass(events, os.path.join(output_dir, output_name + ".ass"))
         filtered_text = filter_non_english_text("\n".join(subtitles))
-        combined_text = process_with_openai(filtered_text, progress_bar_openai, status_label_openai)
-        synthesize_speech(combined_text, output_audio_path, progress_bar_synthesis, status_label_synthesis)
+        openai_progress = progress_channel.reporter("openai")
+        combined_text = process_with_openai(filtered_text, openai_progress, openai_progress)
+        synthesis_progress = progress_channel.reporter("synthesis")
+        synthesize_speech(combined_text, output_audio_path, synthesis_progress, synthesis_progress)
 
         # Merge the new audio with the original video
         merge_audio_video(video_path, output_audio_path, output_video_path)
 
-        messagebox.showinfo("OCR and Synthesis Complete", f"Subtitles extracted, processed, synthesized, and merged successfully.\nOutput saved at: {output_video_path}")
+        progress_channel.call(messagebox.showinfo, "OCR and Synthesis Complete", f"Subtitles extracted, processed, synthesized, and merged successfully.\nOutput saved at: {output_video_path}")
     else:
-        messagebox.showinfo("OCR Complete", "No subtitles were found in the video.")
+        progress_channel.call(messagebox.showinfo, "OCR Complete", "No subtitles were found in the video.")
 
 def update_progress_bar(progress_bar, status_label, status, progress=0):
     status_label.config(text=status)
     progress_bar['value'] = progress
-    root.update_idletasks()
 
 def select_japanese_file():
     file_path = filedialog.askopenfilename(
@@ -253,7 +516,7 @@ def select_output_directory():
         logging.info(f"Selected output directory: {directory}")
 
 def main():
-    global root, japanese_file_path, output_directory, output_filename
+    global root, japanese_file_path, output_directory, output_filename, ocr_engine_name, progress_channel
     global progress_bar_ocr, progress_bar_openai, progress_bar_synthesis
     global status_label_ocr, status_label_openai, status_label_synthesis
 
@@ -281,6 +544,11 @@ def main():
     tk.Label(root, text="Enter Output Filename (without extension):").pack(pady=(10, 0))
     tk.Entry(root, textvariable=output_filename, width=50).pack(padx=10)
 
+    # OCR Engine Selection: Google Vision for difficult episodes, local Tesseract for offline bulk runs
+    ocr_engine_name = tk.StringVar(value=DEFAULT_OCR_ENGINE)
+    tk.Label(root, text="OCR Engine:").pack(pady=(10, 0))
+    ttk.Combobox(root, textvariable=ocr_engine_name, values=list(OCR_ENGINES), state="readonly", width=20).pack(padx=10)
+
     # Progress Bars and Status Labels
     status_label_ocr = tk.Label(root, text="OCR: Not Started")
     status_label_ocr.pack(pady=(10, 0))
@@ -297,6 +565,14 @@ def main():
     progress_bar_synthesis = ttk.Progressbar(root, length=500, mode='determinate')
     progress_bar_synthesis.pack(pady=(5, 0))
 
+    # Worker threads publish per-stage progress; the main loop applies it a few times a second
+    progress_channel = ProgressChannel(root, {
+        "ocr": (progress_bar_ocr, status_label_ocr),
+        "openai": (progress_bar_openai, status_label_openai),
+        "synthesis": (progress_bar_synthesis, status_label_synthesis),
+    })
+    progress_channel.start()
+
     # OCR Button
     ocr_button = tk.Button(root, text="Extract and Process Subtitles (OCR)", command=start_ocr_thread, bg="blue", fg="white", width=30)
     ocr_button.pack(pady=20)
@@ -0,0 +1,97 @@
+"""
+Local stand-in for the Speech API's StreamingRecognize, for trying the streaming
+recognition mode without credentials or network. It doesn't recognize anything:
+every run of loud audio becomes one "speech" result, with an interim result per
+second while it lasts and a final one, word-timed, when a quiet second ends it.
+
+Start it, then point the converter at it:
+    python speech_standin_server.py --port 50051
+    ANIME_SPEECH_ENDPOINT=localhost:50051 ANIME_RECOGNITION_MODE=streaming python main.py
+"""
+import argparse
+import logging
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+import grpc
+import numpy as np
+from google.cloud import speech_v1p1beta1 as speech
+
+# Seconds whose RMS reaches this level (of 16-bit full scale) count as speech
+LOUD_RMS = 500
+
+def _word_result(text, start_seconds, end_seconds, is_final, stability=0.0):
+    word = speech.WordInfo(
+        word=text,
+        start_time=datetime.timedelta(seconds=start_seconds),
+        end_time=datetime.timedelta(seconds=end_seconds)
+    )
+    return speech.StreamingRecognitionResult(
+        alternatives=[speech.SpeechRecognitionAlternative(transcript=text, words=[word] if is_final else [])],
+        is_final=is_final,
+        stability=stability,
+        result_end_time=datetime.timedelta(seconds=end_seconds)
+    )
+
+def _streaming_recognize(request_iterator, context):
+    sample_rate = 16000
+    second_bytes = sample_rate * 2
+    pending = b""
+    position = 0  # Whole seconds received
+    speech_start = None
+    spoken = 0
+
+    def close_speech(end_seconds):
+        nonlocal speech_start, spoken
+        spoken += 1
+        text = f"speech {spoken}"
+        response = speech.StreamingRecognizeResponse(results=[_word_result(text, speech_start, end_seconds, True)])
+        speech_start = None
+        return response
+
+    for request in request_iterator:
+        if "streaming_config" in request:
+            sample_rate = request.streaming_config.config.sample_rate_hertz or sample_rate
+            second_bytes = sample_rate * 2
+            continue
+        pending += request.audio_content
+        while len(pending) >= second_bytes:
+            samples = np.frombuffer(pending[:second_bytes], dtype=np.int16).astype(np.float64)
+            pending = pending[second_bytes:]
+            loud = np.sqrt(np.mean(samples ** 2)) >= LOUD_RMS
+            position += 1
+            if loud:
+                if speech_start is None:
+                    speech_start = position - 1
+                text = f"speech {spoken + 1}"
+                yield speech.StreamingRecognizeResponse(results=[_word_result(text, speech_start, position, False, 0.5)])
+            elif speech_start is not None:
+                yield close_speech(position - 1)
+
+    if speech_start is not None:
+        yield close_speech(position + len(pending) / second_bytes)
+
+def serve(port=50051, max_workers=8):
+    """Starts the stand-in on localhost:port and returns the running grpc server."""
+    handler = grpc.method_handlers_generic_handler("google.cloud.speech.v1p1beta1.Speech", {
+        "StreamingRecognize": grpc.stream_stream_rpc_method_handler(
+            _streaming_recognize,
+            request_deserializer=speech.StreamingRecognizeRequest.deserialize,
+            response_serializer=speech.StreamingRecognizeResponse.serialize
+        ),
+    })
+    server = grpc.server(ThreadPoolExecutor(max_workers=max_workers))
+    server.add_generic_rpc_handlers((handler,))
+    server.add_insecure_port(f"localhost:{port}")
+    server.start()
+    logging.info(f"Speech stand-in listening on localhost:{port}")
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Speech streaming API.")
+    parser.add_argument("--port", type=int, default=50051)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    serve(args.port).wait_for_termination()
+
+if __name__ == "__main__":
+    main()